@@ -1,32 +1,63 @@
 # __init__.py
 from flask import Flask
-from clerk_backend_api import Clerk
+from flask.json.provider import DefaultJSONProvider
 from .config import Config
+from .util.schema import iso_date
 from dotenv import load_dotenv
-import os
+from datetime import datetime
+import importlib
+import time
 
-clerk = None
+# (module, blueprint attribute, url prefix)
+BLUEPRINTS = [
+    ("app.routes.projects", "projects_bp", "/api/projects"),
+    ("app.routes.organizations", "organizations_bp", "/api/organizations"),
+    ("app.routes.stats", "stats_bp", "/api/stats"),
+    ("app.routes.admin", "admin_bp", "/admin"),
+    ("app.routes.users", "users_bp", "/api/users"),
+]
 
 
-def create_app():
-    global clerk
+class JSONProvider(DefaultJSONProvider):
+    """Serialize stored BSON dates as ISO strings instead of HTTP dates."""
+
+    @staticmethod
+    def default(o):
+        if isinstance(o, datetime):
+            return iso_date(o)
+        return DefaultJSONProvider.default(o)
+
 
+def print_startup_report(report):
+    total = sum(r["import_seconds"] + r["register_seconds"] for r in report)
+    print(f"🚀 Blueprints loaded in {total:.3f}s")
+    for r in report:
+        print(f"   {r['module']:<28} import {r['import_seconds']:.4f}s"
+              f"  register {r['register_seconds']:.4f}s")
+
+
+def create_app():
     load_dotenv()
-    clerk = Clerk(os.getenv('CLERK_SECRET_KEY'))
 
     app = Flask(__name__)
+    app.json = JSONProvider(app)
     app.config.from_object(Config)
 
-    from app.routes.projects import projects_bp
-    from app.routes.organizations import organizations_bp
-    from app.routes.stats import stats_bp
-    from app.routes.admin import admin_bp
-    from app.routes.users import users_bp
-
-    app.register_blueprint(projects_bp, url_prefix="/api/projects")
-    app.register_blueprint(organizations_bp, url_prefix="/api/organizations")
-    app.register_blueprint(stats_bp, url_prefix="/api/stats")
-    app.register_blueprint(admin_bp, url_prefix="/admin")
-    app.register_blueprint(users_bp, url_prefix="/api/users")
+    report = []
+    for module_name, attribute, url_prefix in BLUEPRINTS:
+        started = time.perf_counter()
+        module = importlib.import_module(module_name)
+        imported = time.perf_counter()
+        app.register_blueprint(getattr(module, attribute), url_prefix=url_prefix)
+        registered = time.perf_counter()
+
+        report.append({
+            "module": module_name,
+            "import_seconds": round(imported - started, 4),
+            "register_seconds": round(registered - imported, 4)
+        })
+
+    app.config["STARTUP_REPORT"] = report
+    print_startup_report(report)
 
     return app
@@ -0,0 +1,108 @@
+# app/db.py
+"""
+Process-wide MongoDB access. Every blueprint, model, the sync job and the
+CLI tools share one pooled MongoClient per process. The client is created on
+first use, after the environment is loaded, and again after a fork, since a
+MongoClient must not be shared with a child process (gunicorn workers, sync
+job processes).
+
+Pool size, timeouts and wire compression come from the environment:
+MONGO_MAX_POOL_SIZE, MONGO_MIN_POOL_SIZE, MONGO_MAX_IDLE_TIME_MS,
+MONGO_CONNECT_TIMEOUT_MS, MONGO_SERVER_SELECTION_TIMEOUT_MS,
+MONGO_SOCKET_TIMEOUT_MS and MONGO_COMPRESSORS.
+"""
+import os
+import threading
+
+from pymongo import MongoClient
+from pymongo.collection import Collection
+
+DATABASE_NAME = "cordis_db"
+
+_client = None
+_client_pid = None
+_lock = threading.Lock()
+
+
+def _int_env(name, default):
+    value = os.getenv(name)
+    return int(value) if value else default
+
+
+def client_options():
+    options = {
+        "maxPoolSize": _int_env("MONGO_MAX_POOL_SIZE", 50),
+        "minPoolSize": _int_env("MONGO_MIN_POOL_SIZE", 0),
+        "maxIdleTimeMS": _int_env("MONGO_MAX_IDLE_TIME_MS", 300000),
+        "connectTimeoutMS": _int_env("MONGO_CONNECT_TIMEOUT_MS", 10000),
+        "serverSelectionTimeoutMS": _int_env("MONGO_SERVER_SELECTION_TIMEOUT_MS", 10000),
+        # No socket timeout by default: sync aggregations run for minutes
+        "socketTimeoutMS": _int_env("MONGO_SOCKET_TIMEOUT_MS", None),
+        "appname": "nexora",
+    }
+    # zlib is in the standard library; zstd and snappy need extra packages
+    compressors = os.getenv("MONGO_COMPRESSORS", "zlib")
+    if compressors:
+        options["compressors"] = compressors
+    return options
+
+
+def get_client():
+    """The shared client of this process, created on first use and after a fork."""
+    global _client, _client_pid
+    pid = os.getpid()
+    if _client is not None and _client_pid == pid:
+        return _client
+
+    with _lock:
+        if _client is None or _client_pid != pid:
+            # A client inherited from the parent is dropped, never closed here
+            _client = MongoClient(os.getenv("MONGOURL"), **client_options())
+            _client_pid = pid
+    return _client
+
+
+def get_database():
+    return get_client()[DATABASE_NAME]
+
+
+class LazyCollection:
+    """A collection handle that resolves through the current process's client on each use."""
+
+    def __init__(self, name):
+        self.name = name
+
+    def _collection(self):
+        return get_database()[self.name]
+
+    def __getattr__(self, attr):
+        return getattr(self._collection(), attr)
+
+    def __getitem__(self, name):
+        return LazyCollection(f"{self.name}.{name}")
+
+    def __repr__(self):
+        return f"LazyCollection({self.name!r})"
+
+
+class LazyDatabase:
+    """
+    Stand-in for the `cordis_db` Database that modules can bind at import
+    time: `db["projects"]` and `db.projects` give LazyCollections, other
+    attributes come from the current process's database.
+    """
+
+    def __getitem__(self, name):
+        return LazyCollection(name)
+
+    def __getattr__(self, attr):
+        value = getattr(get_database(), attr)
+        if isinstance(value, Collection):
+            return LazyCollection(attr)
+        return value
+
+    def __repr__(self):
+        return f"LazyDatabase({DATABASE_NAME!r})"
+
+
+db = LazyDatabase()
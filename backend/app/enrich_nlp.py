@@ -0,0 +1,292 @@
+"""
+Offline NLP enrichment of the projects collection.
+
+Streams projects, extracts keywords and objective summaries with
+`nlp.pipe` and writes them back with unordered bulk writes, so the request
+path only ever reads stored values.
+
+    python -m app.enrich_nlp --batch-size 128 --n-process 4
+"""
+import argparse
+import json
+import os
+import time
+from datetime import datetime
+
+from bson import ObjectId
+from dotenv import load_dotenv
+from pymongo import UpdateOne
+
+from app.db import get_database
+from app.util.nlp import (
+    SUMMARIZER_VERSION,
+    field_keywords,
+    get_nlp,
+    keyword_text,
+    keywords_content_hash,
+    keywords_from_doc,
+    summarize_doc,
+)
+from app.util.dataset import bump_dataset_version
+from app.util.keyword_stats import rebuild_keyword_stats
+from app.util.summary_cache import SummaryCache
+
+DEFAULT_CHECKPOINT = ".enrich_nlp_checkpoint.json"
+PROJECTION = {"id": 1, "title": 1, "objective": 1, "keywords": 1,
+              "extracted_keywords_hash": 1}
+
+
+def load_checkpoint(path):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_checkpoint(path, last_id, processed):
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump({"last_id": str(last_id), "processed": processed,
+                   "updatedAt": datetime.utcnow().isoformat()}, f)
+    os.replace(tmp_path, path)
+
+
+def iter_chunks(cursor, size):
+    chunk = []
+    for doc in cursor:
+        chunk.append(doc)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def plan_chunks(chunks, cache, keywords, summaries, force=False):
+    """
+    Decide per project what to compute. Keywords are stale when the content
+    hash changed; summaries are needed for objectives missing from the store,
+    looked up once per chunk. Yields one task dict per project, with the
+    last task of each chunk flagged so writes and checkpoints follow chunks.
+    """
+    for chunk in chunks:
+        tasks = []
+        for project in chunk:
+            task = {"project": project, "keywords_hash": None, "summary_key": None}
+            if keywords:
+                content_hash = keywords_content_hash(project)
+                if force or project.get("extracted_keywords_hash") != content_hash:
+                    task["keywords_hash"] = content_hash
+            if summaries and project.get("objective"):
+                task["summary_key"] = cache.key(project["objective"])
+            tasks.append(task)
+
+        if summaries and not force:
+            keys = {task["summary_key"] for task in tasks if task["summary_key"]}
+            if keys:
+                stored = {row["_id"] for row in cache.collection.find(
+                    {"_id": {"$in": list(keys)}}, {"_id": 1})}
+                for task in tasks:
+                    if task["summary_key"] in stored:
+                        task["summary_key"] = None
+
+        # An objective shared by several projects is summarized once per chunk
+        seen = set()
+        for task in tasks:
+            if task["summary_key"] in seen:
+                task["summary_key"] = None
+            elif task["summary_key"]:
+                seen.add(task["summary_key"])
+
+        tasks[-1]["end_of_chunk"] = True
+        yield from tasks
+
+
+def with_keywords(tasks, nlp, batch_size, n_process):
+    """Add `keywords` to tasks with stale keywords through one streaming nlp.pipe."""
+    # Tasks without work pass through as empty texts to keep one ordered stream
+    texts = ((keyword_text(task["project"]) if task["keywords_hash"] else "", task)
+             for task in tasks)
+    for doc, task in nlp.pipe(texts, as_tuples=True, batch_size=batch_size, n_process=n_process):
+        if task["keywords_hash"]:
+            task["keywords"] = field_keywords(task["project"]) | keywords_from_doc(doc)
+        yield task
+
+
+def with_summaries(tasks, nlp, batch_size, n_process):
+    """Add `summary` to tasks whose objective needs one through one streaming nlp.pipe."""
+    texts = ((task["project"]["objective"] if task["summary_key"] else "", task)
+             for task in tasks)
+    for doc, task in nlp.pipe(texts, as_tuples=True, batch_size=batch_size, n_process=n_process):
+        if task["summary_key"]:
+            task["summary"] = summarize_doc(task["project"]["objective"], doc)
+        yield task
+
+
+def chunk_updates(tasks, cache):
+    """UpdateOne operations for stored keywords and for summaries of one chunk."""
+    keyword_updates = []
+    summary_updates = []
+    for task in tasks:
+        if "keywords" in task:
+            keyword_updates.append(UpdateOne(
+                {"_id": task["project"]["_id"]},
+                {"$set": {
+                    "extracted_keywords": list(task["keywords"]),
+                    "extracted_keywords_hash": task["keywords_hash"]
+                }}
+            ))
+        if task.get("summary") is not None:
+            summary_updates.append(UpdateOne(
+                {"_id": task["summary_key"]},
+                {"$set": {
+                    "summary": task["summary"],
+                    "version": cache.version,
+                    "createdAt": datetime.utcnow()
+                }},
+                upsert=True
+            ))
+    return keyword_updates, summary_updates
+
+
+def timed(iterable, timings, stage):
+    """Yield from `iterable`, adding the time spent waiting on it to timings[stage]."""
+    iterator = iter(iterable)
+    while True:
+        t0 = time.perf_counter()
+        item = next(iterator, None)
+        timings[stage] += time.perf_counter() - t0
+        if item is None:
+            return
+        yield item
+
+
+def run(db, batch_size=64, n_process=1, chunk_size=2000, checkpoint=DEFAULT_CHECKPOINT,
+        reset=False, force=False, skip_keywords=False, skip_summaries=False, limit=None):
+    """
+    Enrich every project after the checkpoint and return a throughput report.
+
+    The whole cursor streams through a single nlp.pipe per pipeline, so
+    with n_process > 1 the worker processes start and load the model once
+    per run. Results are written and checkpointed per chunk of projects.
+    """
+    projects_collection = db["projects"]
+    cache = SummaryCache(db["summaries"], SUMMARIZER_VERSION)
+
+    keywords_nlp = None if skip_keywords else get_nlp("keywords")
+    summary_nlp = None if skip_summaries else get_nlp("summary")
+    if keywords_nlp is None and summary_nlp is None:
+        raise RuntimeError("No spaCy pipeline available; nothing to enrich.")
+
+    state = {} if reset else load_checkpoint(checkpoint)
+    query = {}
+    if state.get("last_id"):
+        query["_id"] = {"$gt": ObjectId(state["last_id"])}
+        print(f"↩️ Resuming after {state['last_id']} ({state.get('processed', 0)} done)")
+
+    cursor = projects_collection.find(query, PROJECTION).sort("_id", 1)
+    if limit:
+        cursor = cursor.limit(limit)
+
+    # "nlp" is the time the pipes take beyond reading the cursor
+    timings = {"read": 0.0, "nlp": 0.0, "write": 0.0}
+    processed = state.get("processed", 0)
+    run_processed = 0
+    keywords_written = 0
+    summaries_written = 0
+    started = time.perf_counter()
+
+    tasks = plan_chunks(timed(iter_chunks(cursor, chunk_size), timings, "read"), cache,
+                        keywords_nlp is not None, summary_nlp is not None, force)
+    if keywords_nlp:
+        tasks = with_keywords(tasks, keywords_nlp, batch_size, n_process)
+    if summary_nlp:
+        tasks = with_summaries(tasks, summary_nlp, batch_size, n_process)
+
+    chunk = []
+    for task in timed(tasks, timings, "nlp"):
+        chunk.append(task)
+        if not task.get("end_of_chunk"):
+            continue
+
+        t0 = time.perf_counter()
+        keyword_updates, summary_updates = chunk_updates(chunk, cache)
+        if keyword_updates:
+            projects_collection.bulk_write(keyword_updates, ordered=False)
+        if summary_updates:
+            cache.collection.bulk_write(summary_updates, ordered=False)
+        timings["write"] += time.perf_counter() - t0
+
+        keywords_written += len(keyword_updates)
+        summaries_written += len(summary_updates)
+        processed += len(chunk)
+        run_processed += len(chunk)
+        save_checkpoint(checkpoint, chunk[-1]["project"]["_id"], processed)
+        chunk = []
+
+        elapsed = time.perf_counter() - started
+        print(f"⚙️ {processed} projects ({run_processed / elapsed:.1f} docs/s)")
+    # Reading happens inside the pipes' input streams
+    timings["nlp"] = max(timings["nlp"] - timings["read"], 0.0)
+
+    if keywords_written:
+        print("🔑 Rebuilding keyword statistics...")
+        rebuild_keyword_stats(db)
+        bump_dataset_version(db["meta"])
+
+    # A finished run starts from the beginning next time; up-to-date
+    # projects are skipped by their content hash anyway
+    if not limit and os.path.exists(checkpoint):
+        os.remove(checkpoint)
+
+    elapsed = time.perf_counter() - started
+    return {
+        "processed": run_processed,
+        "total_processed": processed,
+        "keywords_written": keywords_written,
+        "summaries_written": summaries_written,
+        "elapsed_seconds": round(elapsed, 2),
+        "docs_per_second": round(run_processed / elapsed, 1) if elapsed else 0.0,
+        "stage_seconds": {stage: round(t, 2) for stage, t in timings.items()}
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--batch-size", type=int, default=64,
+                        help="texts per nlp.pipe batch")
+    parser.add_argument("--n-process", type=int, default=1,
+                        help="spaCy worker processes")
+    parser.add_argument("--chunk-size", type=int, default=2000,
+                        help="projects per write and checkpoint")
+    parser.add_argument("--checkpoint", default=DEFAULT_CHECKPOINT)
+    parser.add_argument("--reset", action="store_true",
+                        help="ignore the checkpoint and start over")
+    parser.add_argument("--force", action="store_true",
+                        help="recompute values that are already up to date")
+    parser.add_argument("--skip-keywords", action="store_true")
+    parser.add_argument("--skip-summaries", action="store_true")
+    parser.add_argument("--limit", type=int)
+    args = parser.parse_args(argv)
+
+    load_dotenv()
+    report = run(
+        get_database(),
+        batch_size=args.batch_size,
+        n_process=args.n_process,
+        chunk_size=args.chunk_size,
+        checkpoint=args.checkpoint,
+        reset=args.reset,
+        force=args.force,
+        skip_keywords=args.skip_keywords,
+        skip_summaries=args.skip_summaries,
+        limit=args.limit
+    )
+
+    print("✅ Enrichment completed.")
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+"""
+Apply the declared MongoDB indexes, or report on them.
+
+Indexes are built here or by the sync job, never at app startup, so
+workers boot without waiting on the database.
+
+    python -m app.manage_indexes            # create missing indexes
+    python -m app.manage_indexes --report   # missing, unused and redundant indexes
+"""
+import argparse
+import json
+import time
+
+from dotenv import load_dotenv
+
+from app.db import get_database
+from app.util.indexes import INDEXES, ensure_indexes, index_report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--report", action="store_true",
+                        help="print the index report instead of creating indexes")
+    parser.add_argument("--collection", action="append", choices=sorted(INDEXES),
+                        help="limit to this collection (repeatable)")
+    args = parser.parse_args(argv)
+
+    load_dotenv()
+    db = get_database()
+
+    if args.report:
+        print(json.dumps(index_report(db), indent=2, default=str))
+        return
+
+    started = time.perf_counter()
+    created = ensure_indexes(db, args.collection)
+    for name, indexes in created.items():
+        print(f"📈 Created indexes on {name}: {', '.join(indexes) or 'none'}")
+    print(f"✅ Indexes checked in {time.perf_counter() - started:.3f}s")
+
+
+if __name__ == "__main__":
+    main()
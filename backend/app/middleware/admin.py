@@ -0,0 +1,25 @@
+from flask import request, jsonify
+from functools import wraps
+import hmac
+import os
+
+
+def require_admin_key(f):
+    """
+    Decorator for admin operations that change the database. The request
+    must send ADMIN_API_KEY in the X-Admin-Key header; without a configured
+    key the operation is refused.
+    """
+    @wraps(f)
+    def decorated(*args, **kwargs):
+        expected = os.getenv("ADMIN_API_KEY")
+        if not expected:
+            return jsonify({"error": "Admin API key not configured"}), 503
+
+        provided = request.headers.get("X-Admin-Key", "")
+        if not hmac.compare_digest(provided.encode("utf-8"), expected.encode("utf-8")):
+            return jsonify({"error": "Missing or invalid admin key"}), 401
+
+        return f(*args, **kwargs)
+
+    return decorated
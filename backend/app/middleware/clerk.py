@@ -1,48 +1,74 @@
 from flask import request, jsonify, g
 from functools import wraps
-from clerk_backend_api.security.types import AuthenticateRequestOptions, TokenVerificationError, AuthStatus, VerifyTokenOptions
-from app import clerk
 from app.models import UserModel
+from app.util.auth import TokenVerifier, user_cache
 import jwt
 
+_verifier = None
+
+
+def get_verifier():
+    """The token verifier, configured from the environment on first use."""
+    global _verifier
+    if _verifier is None:
+        _verifier = TokenVerifier.from_env()
+    return _verifier
+
+
+def request_token(allow_cookie=False):
+    """The bearer token of the request, or Clerk's __session cookie if allowed."""
+    auth_header = request.headers.get("Authorization", "")
+    if auth_header.startswith("Bearer "):
+        return auth_header.split(" ", 1)[1]
+    if allow_cookie:
+        return request.cookies.get("__session")
+    return None
+
+
+def load_user(claims):
+    """
+    Set g.clerk_user_id and g.user for verified claims. The user document is
+    served from the per-worker cache when present, so repeated requests of a
+    session do not touch the database.
+    """
+    user_id = claims["sub"]
+    user = user_cache.get(user_id)
+    if user is None:
+        user = UserModel().get_or_create_user(
+            clerk_user_id=user_id,
+            email=claims.get("email")
+        )
+        user_cache.put(user_id, user)
+
+    g.clerk_user_id = user_id
+    g.claims = claims
+    # Copy so a handler changing g.user does not change the cached document
+    g.user = dict(user)
+
 
 def require_auth(f):
     """
     Decorator to protect routes with Clerk authentication.
-    Verifies JWT token and loads user data into g.user and g.clerk_user_id
+    Verifies the JWT signature and claims locally and loads user data into
+    g.user and g.clerk_user_id
     """
     @wraps(f)
     def decorated(*args, **kwargs):
-        auth_header = request.headers.get("Authorization", "")
-
-        if not auth_header.startswith("Bearer "):
+        token = request_token()
+        if not token:
             return jsonify({"error": "Missing or invalid Authorization header"}), 401
 
-        token = auth_header.split(" ", 1)[1]
-
         try:
-            # Decode JWT without verification first to see the user_id
-            decoded = jwt.decode(token, options={"verify_signature": False})
-
-            user_id = decoded.get("sub")
-            email = decoded.get("email")  # Extract email from token
-
-            if not user_id:
-                return jsonify({"error": "Invalid token: missing user ID"}), 401
-
-            # For now, trust the token (we'll add verification later)
-            # In production, you should verify with Clerk's JWKS
-            g.clerk_user_id = user_id
-
-            # Get or create user in MongoDB
-            user_model = UserModel()
-            g.user = user_model.get_or_create_user(
-                clerk_user_id=user_id,
-                email=email
-            )
+            claims = get_verifier().verify(token)
+        except jwt.PyJWKClientError as e:
+            print(f"Could not fetch Clerk signing keys: {e}")
+            return jsonify({"error": "Authentication service unavailable"}), 503
+        except jwt.PyJWTError as e:
+            return jsonify({"error": f"Invalid token: {str(e)}"}), 401
 
+        try:
+            load_user(claims)
         except Exception as e:
-
             return jsonify({"error": f"Authentication error: {str(e)}"}), 500
 
         return f(*args, **kwargs)
@@ -58,29 +84,13 @@ def optional_auth(f):
     """
     @wraps(f)
     def decorated(*args, **kwargs):
-        try:
-            # Try to authenticate the request
-            auth_state = clerk.authenticate_request(
-                request,
-                AuthenticateRequestOptions()
-            )
-
-            # Only set user if successfully signed in
-            if auth_state.status == AuthStatus.SIGNED_IN:
-                user_id = auth_state.to_auth().user_id
-
-                if user_id:
-                    g.clerk_user_id = user_id
-                    g.auth_state = auth_state
-
-                    user_model = UserModel()
-                    g.user = user_model.get_or_create_user(
-                        clerk_user_id=user_id,
-                        email=None
-                    )
-        except:
-            # If authentication fails, continue without user
-            pass
+        token = request_token(allow_cookie=True)
+        if token:
+            try:
+                load_user(get_verifier().verify(token))
+            except Exception:
+                # If authentication fails, continue without user
+                pass
 
         return f(*args, **kwargs)
 
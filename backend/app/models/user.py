@@ -1,17 +1,21 @@
 from datetime import datetime
-from pymongo import MongoClient
-import os
+
+from app.db import db
+from app.util.auth import user_cache
 
 
 class UserModel:
     """Handles all MongoDB operations for user data"""
 
     def __init__(self):
-        mongo_client = MongoClient(os.getenv("MONGOURL"))
-        db = mongo_client["cordis_db"]
+        # Shared pooled client; the clerkUserId index is declared in app.util.indexes
         self.collection = db["users"]
-        # Create index on clerkUserId for fast lookups
-        self.collection.create_index("clerkUserId", unique=True)
+
+    def _update_user(self, clerk_user_id, update):
+        """Apply `update` to the user and drop the cached copy used by the auth middleware"""
+        result = self.collection.update_one({"clerkUserId": clerk_user_id}, update)
+        user_cache.invalidate(clerk_user_id)
+        return result
 
     def get_or_create_user(self, clerk_user_id, email=None):
         """
@@ -39,8 +43,8 @@ class UserModel:
         else:
             # Update email if provided and different
             if email and user.get('email') != email:
-                self.collection.update_one(
-                    {"clerkUserId": clerk_user_id},
+                self._update_user(
+                    clerk_user_id,
                     {"$set": {"email": email, "updatedAt": datetime.utcnow()}}
                 )
                 user['email'] = email
@@ -53,8 +57,8 @@ class UserModel:
 
     def add_favorite(self, clerk_user_id, project_id):
         """Add a project to user's favorites"""
-        return self.collection.update_one(
-            {"clerkUserId": clerk_user_id},
+        return self._update_user(
+            clerk_user_id,
             {
                 "$addToSet": {"favorites": project_id},
                 "$set": {"updatedAt": datetime.utcnow()}
@@ -63,8 +67,8 @@ class UserModel:
 
     def remove_favorite(self, clerk_user_id, project_id):
         """Remove a project from user's favorites"""
-        return self.collection.update_one(
-            {"clerkUserId": clerk_user_id},
+        return self._update_user(
+            clerk_user_id,
             {
                 "$pull": {"favorites": project_id},
                 "$set": {"updatedAt": datetime.utcnow()}
@@ -82,8 +86,8 @@ class UserModel:
             "projectId": project_id,
             "openedAt": datetime.utcnow()
         }
-        return self.collection.update_one(
-            {"clerkUserId": clerk_user_id},
+        return self._update_user(
+            clerk_user_id,
             {
                 "$push": {
                     "history": {
@@ -106,8 +110,8 @@ class UserModel:
 
     def update_preferences(self, clerk_user_id, preferences):
         """Update user preferences (topics, funding_types, etc.)"""
-        return self.collection.update_one(
-            {"clerkUserId": clerk_user_id},
+        return self._update_user(
+            clerk_user_id,
             {
                 "$set": {
                     "preferences": preferences,
@@ -123,8 +127,8 @@ class UserModel:
 
     def delete_all_favorites(self, clerk_user_id):
         """Delete all favorites for a user"""
-        return self.collection.update_one(
-            {"clerkUserId": clerk_user_id},
+        return self._update_user(
+            clerk_user_id,
             {
                 "$set": {
                     "favorites": [],
@@ -135,8 +139,8 @@ class UserModel:
 
     def delete_all_history(self, clerk_user_id):
         """Delete all history for a user"""
-        return self.collection.update_one(
-            {"clerkUserId": clerk_user_id},
+        return self._update_user(
+            clerk_user_id,
             {
                 "$set": {
                     "history": [],
@@ -147,8 +151,8 @@ class UserModel:
 
     def delete_history_item(self, clerk_user_id, project_id):
         """Delete a specific project from history"""
-        return self.collection.update_one(
-            {"clerkUserId": clerk_user_id},
+        return self._update_user(
+            clerk_user_id,
             {
                 "$pull": {
                     "history": {"projectId": project_id}
@@ -162,8 +166,8 @@ class UserModel:
         Reorder favorites with a new array order.
         new_order should be a list of project IDs in the desired order.
         """
-        return self.collection.update_one(
-            {"clerkUserId": clerk_user_id},
+        return self._update_user(
+            clerk_user_id,
             {
                 "$set": {
                     "favorites": new_order,
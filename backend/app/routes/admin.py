@@ -1,15 +1,108 @@
-from flask import Blueprint, jsonify
-from app.sync_cordis import sync_cordis
+from flask import Blueprint, current_app, jsonify, request
 
-admin_bp = Blueprint("admin", __name__)
+from app.db import db
+from app.middleware.admin import require_admin_key
+from app.sync_cordis import deltas_since_previous, has_previous_generation
+from app.sync_jobs import SyncLockHeld, get_sync_job, list_sync_jobs, start_sync_job
+from app.util.auth import user_cache
+from app.util.indexes import ensure_indexes, index_report
+from app.util.nlp import nlp_report
+from app.util.project_details import summary_cache
+from app.util.result_store import result_store
 
+admin_bp = Blueprint("admin", __name__)
 
 @admin_bp.route("/sync-data", methods=["POST"])
+@require_admin_key
 def sync_data():
-    result = sync_cordis()
+    mode = request.args.get("mode", "auto")
+    if mode not in ("auto", "full", "delta"):
+        return jsonify({"status": "error", "message": f"Unknown sync mode: {mode}"}), 400
+
+    try:
+        job_id = start_sync_job(
+            db,
+            mode=mode,
+            force=request.args.get("force", "false").lower() == "true"
+        )
+    except SyncLockHeld as e:
+        return jsonify({"status": "error", "message": str(e), "job_id": e.job_id}), 409
+
+    return jsonify({
+        "status": "queued",
+        "message": "CORDIS sync started",
+        "job_id": job_id,
+        "status_url": f"/admin/sync-jobs/{job_id}"
+    }), 202
+
+
+@admin_bp.route("/sync-jobs", methods=["GET"])
+def sync_jobs():
+    limit = min(int(request.args.get("limit", 20)), 100)
+    return jsonify(list_sync_jobs(db, limit))
+
+
+@admin_bp.route("/sync-jobs/<job_id>", methods=["GET"])
+def sync_job_status(job_id):
+    job = get_sync_job(db, job_id)
+    if job is None:
+        return jsonify({"status": "error", "message": "Sync job not found"}), 404
+    return jsonify(job)
+
+
+@admin_bp.route("/sync-rollback", methods=["POST"])
+@require_admin_key
+def sync_rollback():
+    if not has_previous_generation(db):
+        return jsonify({"status": "error", "message": "No previous generation to roll back to"}), 409
+
+    # The previous generation predates any delta sync since the last full one
+    force = request.args.get("force", "false").lower() == "true"
+    deltas = deltas_since_previous(db)
+    if deltas and not force:
+        return jsonify({
+            "status": "error",
+            "message": f"{deltas} delta sync(s) ran since the previous generation was saved; "
+                       f"rolling back would drop them. Retry with force=true to roll back anyway.",
+            "deltas_since_previous": deltas
+        }), 409
+
+    try:
+        job_id = start_sync_job(db, mode="rollback", force=force)
+    except SyncLockHeld as e:
+        return jsonify({"status": "error", "message": str(e), "job_id": e.job_id}), 409
+
+    return jsonify({
+        "status": "queued",
+        "message": "Rollback started",
+        "job_id": job_id,
+        "status_url": f"/admin/sync-jobs/{job_id}"
+    }), 202
+
+
+@admin_bp.route("/indexes", methods=["GET"])
+def indexes():
+    return jsonify(index_report(db))
+
+
+@admin_bp.route("/indexes", methods=["POST"])
+@require_admin_key
+def apply_indexes():
+    return jsonify({"status": "success", "created": ensure_indexes(db)})
+
+
+@admin_bp.route("/startup-report", methods=["GET"])
+def startup_report():
+    return jsonify({
+        "blueprints": current_app.config.get("STARTUP_REPORT", []),
+        "nlp_pipelines": nlp_report()
+    })
+
+
+@admin_bp.route("/cache-stats", methods=["GET"])
+def cache_stats():
     return jsonify({
-        "status": "success",
-        "message": "CORDIS data synced successfully",
-        "projects_inserted": result["projects_count"],
-        "organizations_inserted": result["organizations_count"]
+        "result_store": result_store.stats(),
+        "summary_cache": summary_cache.stats(),
+        "user_cache": user_cache.stats()
     })
@@ -1,14 +1,18 @@
 # app/routes/organizations.py
 from flask import Blueprint, request, jsonify
-from pymongo import MongoClient
-import os
+from app.db import db
+from app.util.counts import page_total, result_count
+from app.util.dataset import DatasetVersion
+from app.util.enrichment import fetch_organization_stats
+from app.util.pagination import InvalidCursor, keyset_find, page_size
+from app.util.result_store import result_store
+from app.util.schema import HIDE_SYNC_FIELDS
 
 organizations_bp = Blueprint("organizations", __name__)
 
-# MongoDB connection (reuse across requests)
-mongo_client = MongoClient(os.getenv("MONGOURL"))
-db = mongo_client["cordis_db"]
 organizations_collection = db["organizations"]
+organization_stats_collection = db["organization_stats"]
+dataset_version = DatasetVersion(db["meta"])
 
 
 @organizations_bp.route("/", methods=["GET"])
@@ -16,6 +20,8 @@ def list_organizations():
     """
     List organizations with optional filters, search, and pagination.
     Example: /api/organizations?country=DE&search=university&page=2&limit=10
+    Deep pages should follow `next_cursor` (?cursor=...) instead of page numbers.
+    Totals above 1000 are reported as "1000+" unless exact=true.
     """
 
     search_query = request.args.get("search", "").strip()
@@ -24,9 +30,8 @@ def list_organizations():
     sme = request.args.get("sme", "").strip().lower()  # "true" or "false"
     project_acronym = request.args.get("projectAcronym", "").strip()
 
-    page = int(request.args.get("page", 1))
-    limit = int(request.args.get("limit", 20))
-    skip = (page - 1) * limit
+    page = max(request.args.get("page", 1, type=int), 1)
+    limit = page_size(request.args.get("limit"), 20)
 
     query = {}
     if search_query:
@@ -40,19 +45,38 @@ def list_organizations():
     if project_acronym:
         query["projectAcronym"] = project_acronym
 
-    total_count = organizations_collection.count_documents(query)
-    cursor = organizations_collection.find(query).skip(skip).limit(limit)
+    try:
+        docs, next_cursor = keyset_find(
+            organizations_collection, query, limit, request.args.get("cursor"), page,
+            HIDE_SYNC_FIELDS)
+    except InvalidCursor as e:
+        return jsonify({"error": str(e)}), 400
+
+    count, capped = result_count(
+        result_store, dataset_version, organizations_collection, query, len(docs), page, limit,
+        cursor=request.args.get("cursor"), exact=request.args.get("exact") == "true")
+    total, pages = page_total(count, capped, page, limit, next_cursor is not None)
 
     organizations = []
-    for doc in cursor:
+    for doc in docs:
         doc["_id"] = str(doc["_id"])
         organizations.append(doc)
 
+    # Attach materialized participation statistics with a single $in lookup
+    stats = fetch_organization_stats(
+        organization_stats_collection,
+        {doc["organisationID"] for doc in organizations if doc.get("organisationID")})
+    for doc in organizations:
+        doc["stats"] = stats.get(doc.get("organisationID"))
+
     return jsonify({
         "page": page,
         "limit": limit,
-        "total": total_count,
-        "results": organizations
+        "total": total,
+        "total_capped": capped,
+        "pages": pages,
+        "results": organizations,
+        "next_cursor": next_cursor
     })
 
 
@@ -62,9 +86,11 @@ def get_organization(organization_id):
     Get a single organization by its organisationID (not _id).
     """
     org = organizations_collection.find_one(
-        {"organisationID": organization_id})
+        {"organisationID": organization_id}, HIDE_SYNC_FIELDS)
     if not org:
         return jsonify({"error": "Organization not found"}), 404
 
     org["_id"] = str(org["_id"])
+    org["stats"] = organization_stats_collection.find_one(
+        {"organisationID": organization_id}, {"_id": 0})
     return jsonify(org)
@@ -1,33 +1,43 @@
 # app/routes/projects.py
-from bson import ObjectId
 from flask import Blueprint, jsonify, request
-from pymongo import MongoClient, ASCENDING, DESCENDING
-import os
+from pymongo import ASCENDING, DESCENDING
 from datetime import datetime
-from collections import Counter
-import re
 
 
 # expiring-soon
 from datetime import datetime, timedelta
 from dateutil.relativedelta import relativedelta
 
-# NLP imports
-import spacy
-
-# Initialize spaCy model
-try:
-    nlp = spacy.load("en_core_web_sm")
-except OSError:
-    nlp = None
+from app.db import db
+from app.util.keyword_stats import ANY, top_keywords
+from app.util.autocomplete import PrefixIndex
+from app.util.dataset import DatasetVersion, VersionedValue
+from app.util.topics import build_topic_catalogue
+from app.util.result_store import result_store, shared_result
+from app.util.schema import HIDE_SYNC_FIELDS, iso_date, parse_date
+from app.util.pagination import InvalidCursor, keyset_find, page_size
+from app.util.counts import page_total, result_count
+from app.util.nlp import summarize_objective
+from app.util.project_details import (
+    MAX_BATCH_IDS,
+    PROJECT_SECTIONS,
+    enrich_projects_with_organizations,
+    expand_projects,
+    fetch_projects,
+    get_project_keywords,
+    get_projects_keywords,
+    parse_id_list,
+    parse_sections,
+    summary_cache,
+)
 
 projects_bp = Blueprint("projects", __name__)
 
 # --- MongoDB Setup ---
-mongo_client = MongoClient(os.getenv("MONGOURL"))
-db = mongo_client["cordis_db"]
 projects_collection = db["projects"]
 organizations_collection = db["organizations"]
+keyword_stats_collection = db["keyword_stats"]
+dataset_version = DatasetVersion(db["meta"])
 
 
 def normalize_project(doc):
@@ -37,36 +47,19 @@ def normalize_project(doc):
         "acronym": doc.get("acronym"),
         "title": doc.get("title"),
         "status": doc.get("status"),
-        "start_date": _parse_date(doc.get("startDate")),
-        "end_date": _parse_date(doc.get("endDate")),
-        "total_cost": _parse_float(doc.get("totalCost")),
-        "eu_contribution": _parse_float(doc.get("ecMaxContribution")),
+        "start_date": iso_date(doc.get("startDate")),
+        "end_date": iso_date(doc.get("endDate")),
+        "total_cost": doc.get("totalCost") or 0.0,
+        "eu_contribution": doc.get("ecMaxContribution") or 0.0,
         "legal_basis": doc.get("legalBasis"),
         "topics": doc.get("topics"),
         "programme": doc.get("frameworkProgramme"),
         "objective": doc.get("objective"),
-        "signature_date": doc.get("ecSignatureDate"),
+        "signature_date": iso_date(doc.get("ecSignatureDate")),
         "keywords": doc.get("keywords")  # Add keywords field
     }
 
 
-def _parse_float(val):
-    try:
-        return float(str(val).replace(",", "").strip()) if val not in (None, "") else 0.0
-    except Exception:
-        return 0.0
-
-
-def _parse_date(val):
-    if not val:
-        return None
-    try:
-        # Normalize YYYY-MM-DD format
-        return datetime.strptime(val, "%Y-%m-%d").date().isoformat()
-    except Exception:
-        return None
-
-
 def serialize_doc(doc):
     """Convert ObjectId to string for JSON."""
     doc = dict(doc)
@@ -75,263 +68,100 @@ def serialize_doc(doc):
     return doc
 
 
-def convert_objectid(doc):
-    """Convert all ObjectId fields in a document to strings."""
-    for k, v in doc.items():
-        if isinstance(v, ObjectId):
-            doc[k] = str(v)
-    return doc
-
-
 # === NEW KEYWORD FUNCTIONS ===
 
-def extract_project_keywords(project):
-    """Extract and normalize keywords from project's keyword field and text content."""
-    keywords = set()
-
-    # 1. Use existing keywords field (most important)
-    if project.get("keywords"):
-        project_keywords = project["keywords"]
-        if isinstance(project_keywords, str):
-            # Split by common delimiters
-            raw_keywords = re.split(r'[,;|\n]+', project_keywords)
-            for keyword in raw_keywords:
-                cleaned = keyword.strip().lower()
-                if len(cleaned) > 2:  # Filter out very short words
-                    keywords.add(cleaned)
-        elif isinstance(project_keywords, list):
-            for keyword in project_keywords:
-                if isinstance(keyword, str):
-                    cleaned = keyword.strip().lower()
-                    if len(cleaned) > 2:
-                        keywords.add(cleaned)
-
-    # 2. Extract from title and objective using NLP (if available)
-    if nlp:
-        text_content = ""
-        if project.get("title"):
-            text_content += project["title"] + " "
-        if project.get("objective"):
-            # Take first 500 chars to avoid processing very long texts
-            text_content += project["objective"][:500]
-
-        if text_content:
-            try:
-                doc = nlp(text_content)
-                # Extract meaningful entities and noun phrases
-                for ent in doc.ents:
-                    if ent.label_ in ["PRODUCT", "TECHNOLOGY", "ORG", "EVENT", "WORK_OF_ART"]:
-                        cleaned = ent.text.lower().strip()
-                        if len(cleaned) > 2:
-                            keywords.add(cleaned)
-
-                # Extract key noun phrases (2-4 words)
-                for chunk in doc.noun_chunks:
-                    if 2 <= len(chunk.text.split()) <= 4:
-                        cleaned = chunk.text.lower().strip()
-                        if len(cleaned) > 5:  # Longer phrases only
-                            keywords.add(cleaned)
-
-            except Exception as e:
-                print(f"Error in NLP keyword extraction: {e}")
-
-    return list(keywords)
-
-
-def get_trending_keywords(limit=50):
-    """Get most common keywords across all projects."""
+def get_trending_keywords(limit=50, programme=None, year=None, status=None):
+    """Get most common keywords across all projects, optionally within a slice."""
     try:
-        # Aggregate keywords from all projects
-        pipeline = [
-            {"$match": {"keywords": {"$exists": True, "$ne": None}}},
-            {"$project": {"keywords": 1, "title": 1, "objective": 1}},
-            {"$limit": 1000}  # Process reasonable number of projects
-        ]
+        return top_keywords(keyword_stats_collection, programme, year, status, limit)
+    except Exception as e:
+        print(f"Error getting trending keywords: {e}")
+        return []
 
-        projects = list(projects_collection.aggregate(pipeline))
-        all_keywords = []
 
-        for project in projects:
-            keywords = extract_project_keywords(project)
-            all_keywords.extend(keywords)
+def build_keyword_index():
+    """Prefix index over the corpus-wide keyword vocabulary and its frequencies."""
+    rows = keyword_stats_collection.find(
+        {"programme": ANY, "year": ANY, "status": ANY},
+        {"_id": 0, "keyword": 1, "count": 1})
+    return PrefixIndex((row["keyword"], row["count"]) for row in rows)
 
-        # Count frequency and return top keywords
-        keyword_counter = Counter(all_keywords)
-        return [{"keyword": k, "count": v} for k, v in keyword_counter.most_common(limit)]
 
-    except Exception as e:
-        print(f"Error getting trending keywords: {e}")
-        return []
+keyword_index = VersionedValue(dataset_version, build_keyword_index)
 
 
 def get_keyword_suggestions(query, limit=10):
-    """Get keyword suggestions based on partial query."""
+    """Get keyword suggestions based on partial query, most popular first."""
     try:
         if len(query) < 2:
             return []
 
-        # Use text search on keywords field
-        search_pipeline = [
-            {
-                "$match": {
-                    "$or": [
-                        {"keywords": {"$regex": query, "$options": "i"}},
-                        {"title": {"$regex": query, "$options": "i"}}
-                    ]
-                }
-            },
-            {"$project": {"keywords": 1, "title": 1}},
-            {"$limit": 100}
-        ]
-
-        projects = list(projects_collection.aggregate(search_pipeline))
-        suggestions = set()
-
-        for project in projects:
-            keywords = extract_project_keywords(project)
-            for keyword in keywords:
-                if query.lower() in keyword.lower():
-                    suggestions.add(keyword)
-                    if len(suggestions) >= limit:
-                        break
-            if len(suggestions) >= limit:
-                break
-
-        return sorted(list(suggestions))
+        return [keyword for keyword, _ in keyword_index.get().suggest(query, limit)]
 
     except Exception as e:
         print(f"Error getting keyword suggestions: {e}")
         return []
 
 
-def summarize_objective(objective_text, max_sentences=3):
-    """Enhanced summarization using both NLP and project-specific keywords."""
-    if not objective_text or not nlp:
-        return None
-
-    try:
-        doc = nlp(objective_text)
-        sentences = list(doc.sents)
-
-        if len(sentences) <= max_sentences:
-            return objective_text
-
-        # Enhanced keywords specific to EU research projects
-        eu_keywords = [
-            # Core objectives
-            "aims", "objective", "goal", "purpose", "mission", "vision",
-            # Actions
-            "develop", "create", "improve", "enhance", "support", "promote",
-            "address", "focus", "target", "seek", "investigate", "explore",
-            "implement", "establish", "facilitate", "deliver", "provide",
-            # EU-specific terms
-            "innovation", "research", "technology", "sustainability", "digital",
-            "climate", "environment", "health", "security", "mobility",
-            "energy", "agriculture", "education", "society", "economy",
-            # Impact words
-            "impact", "benefit", "solution", "challenge", "opportunity",
-            "transformation", "advancement", "breakthrough", "excellence"
-        ]
-
-        scored = []
-        for i, sent in enumerate(sentences):
-            score = 0
-            sent_text = sent.text.lower()
-
-            # Keyword matching
-            score += sum(2 if word in sent_text else 0 for word in eu_keywords)
-
-            # Position bonus (first sentences often contain main objectives)
-            if i == 0:
-                score += 5
-            elif i == 1:
-                score += 3
-
-            # Length penalty for very short or very long sentences
-            word_count = len(sent.text.split())
-            if 10 <= word_count <= 30:
-                score += 1
-
-            # Entity bonus (using spaCy NER)
-            entities = [ent.label_ for ent in sent.ents]
-            if any(label in entities for label in ["PRODUCT", "TECHNOLOGY", "ORG"]):
-                score += 2
-
-            scored.append((score, sent.text.strip()))
-
-        # Sort by score and take top sentences
-        scored.sort(key=lambda x: x[0], reverse=True)
-        top_sentences = [s for _, s in scored[:max_sentences]]
-
-        # Maintain original order for readability
-        original_order = []
-        for sent in sentences:
-            if sent.text.strip() in top_sentences:
-                original_order.append(sent.text.strip())
-                if len(original_order) == max_sentences:
-                    break
-
-        return " ".join(original_order)
-
-    except Exception as e:
-        print(f"Error in enhanced summarization: {str(e)}")
+def get_objective_summary(objective_text):
+    """Return the cached summary of an objective, summarizing it on a miss."""
+    if not objective_text:
         return None
+    return summary_cache.get_or_compute(objective_text, summarize_objective)
 
 
-def enrich_project_with_organizations(project_doc):
-    """Add organization data to a project document, excluding the coordinator from organizations list."""
-    project_id = project_doc["id"]
-
-    # Fetch related organizations
-    organizations = []
-    coordinator = None
-
-    for org in organizations_collection.find({"projectID": project_id}):
-        org_data = serialize_doc(org)
+def countries_filter(countries):
+    """
+    Build a projects query condition matching projects with a participant in
+    any of `countries`. Uses the `countries` field written at sync time and
+    falls back to resolving project IDs from organizations on older datasets.
+    """
+    if projects_collection.find_one({"countries": {"$exists": True}}, {"_id": 1}):
+        return {"countries": {"$in": countries}}
 
-        # Count how many projects this organization participates in
-        org_data["project_count"] = organizations_collection.count_documents({
-            "organisationID": org_data["organisationID"]
-        })
-
-        # Count how many projects this organization coordinates
-        org_data["coordinator_count"] = organizations_collection.count_documents({
-            "organisationID": org_data["organisationID"],
-            "role": {"$regex": "^coordinator$", "$options": "i"}
-        })
+    project_ids = organizations_collection.distinct(
+        "projectID", {"country": {"$in": countries}})
+    return {"id": {"$in": project_ids}}
 
-        # Check if this is the coordinator
-        if org_data.get("role", "").lower() == "coordinator":
-            coordinator = org_data
-        else:
-            organizations.append(org_data)
-
-    # Create a copy of the project document and add organization data
-    enriched_project = project_doc.copy()
-    enriched_project["coordinator"] = coordinator
-    enriched_project["organizations"] = organizations
 
-    return enriched_project
+def build_text_search(q, phrase=False):
+    """
+    Build a `$text` search string. Quoted phrases in `q` are kept as phrases
+    and `phrase=True` treats the whole query as one phrase.
+    """
+    q = q.replace("\u201c", '"').replace("\u201d", '"').strip()
+    if phrase:
+        return '"' + q.replace('"', "") + '"'
+    # Drop an unbalanced trailing quote so the phrase parser does not choke
+    if q.count('"') % 2:
+        q = q[::-1].replace('"', "", 1)[::-1]
+    return q
 
 
 # === EXISTING ROUTES (UNCHANGED) ===
 
 @projects_bp.route("/", methods=["GET"])
 def list_projects():
-    """Return first N projects with pagination."""
-    page = int(request.args.get("page", 1))
-    per_page = int(request.args.get("limit", 20))
-    skip = (page - 1) * per_page
+    """Return first N projects with pagination; pass `next_cursor` back as `cursor` for the next page."""
+    page = max(request.args.get("page", 1, type=int), 1)
+    per_page = page_size(request.args.get("limit"), 20)
 
-    cursor = projects_collection.find({}).skip(skip).limit(per_page)
-    projects = [normalize_project(doc) for doc in cursor]
+    try:
+        docs, next_cursor = keyset_find(
+            projects_collection, {}, per_page, request.args.get("cursor"), page,
+            HIDE_SYNC_FIELDS)
+    except InvalidCursor as e:
+        return jsonify({"error": str(e)}), 400
+
+    projects = [normalize_project(doc) for doc in docs]
     total_count = projects_collection.estimated_document_count()
 
     return jsonify({
         "page": page,
         "limit": per_page,
         "total": total_count,
-        "results": projects
+        "results": projects,
+        "next_cursor": next_cursor
     })
 
 
@@ -341,11 +171,8 @@ def get_recent_projects():
     cursor = projects_collection.find({}).sort(
         "startDate", DESCENDING).limit(15)
 
-    projects = []
-    for doc in cursor:
-        normalized = normalize_project(doc)
-        enriched = enrich_project_with_organizations(normalized)
-        projects.append(enriched)
+    projects = enrich_projects_with_organizations(
+        normalize_project(doc) for doc in cursor)
 
     # print(projects_collection.distinct("topics"))
     # print(f"programme", projects_collection.distinct("frameworkProgramme"))
@@ -359,60 +186,83 @@ def get_closed_projects():
     cursor = projects_collection.find(
         {"endDate": {"$ne": None}}).sort("endDate", ASCENDING).limit(15)
 
-    projects = []
-    for doc in cursor:
-        normalized = normalize_project(doc)
-        enriched = enrich_project_with_organizations(normalized)
-        projects.append(enriched)
+    projects = enrich_projects_with_organizations(
+        normalize_project(doc) for doc in cursor)
 
     return jsonify(projects)
 
 
+def build_topics():
+    return build_topic_catalogue(projects_collection, db["topics"])
+
+
+topic_catalogue = VersionedValue(dataset_version, build_topics)
+
+
+# Most topics /all_topics/search returns, as before the catalogue
+MAX_TOPIC_RESULTS = 1000
+
+
+def topics_response(entries, default_limit, max_limit=None):
+    """
+    Paginate ranked catalogue entries, at most `max_limit` per page when
+    given; `detail=true` returns codes with titles and counts.
+    """
+    page = max(request.args.get("page", 1, type=int), 1)
+    limit = max(request.args.get("limit", default_limit, type=int), 1)
+    if max_limit is not None:
+        limit = min(limit, max_limit)
+    page_entries = entries[(page - 1) * limit:page * limit]
+
+    if request.args.get("detail") == "true":
+        return jsonify({
+            "results": page_entries,
+            "total": len(entries),
+            "page": page,
+            "limit": limit
+        })
+    return jsonify([entry["code"] for entry in page_entries])
+
+
 @projects_bp.route("/all_topics", methods=["GET"])
 def get_all_topics():
-    all_topics = db.projects.distinct("topics")
-    return jsonify(all_topics)
+    # The full list stays uncapped: Horizon has more than 1000 topics
+    entries = topic_catalogue.get().entries
+    return topics_response(entries, default_limit=max(len(entries), 1))
 
 
 @projects_bp.route('/all_topics/search')
 def search_topics():
     query = request.args.get('q', '')
-    topics = db.projects.distinct("topics")
-    filtered = [p for p in topics if query.lower() in p.lower()]
-    return jsonify(filtered[:1000])  # Limit results
+    return topics_response(topic_catalogue.get().search(query),
+                           default_limit=MAX_TOPIC_RESULTS, max_limit=MAX_TOPIC_RESULTS)
 
 
 @projects_bp.route("/expiring_soon", methods=["GET"])
 def get_expiring_soon_projects():
     """Return projects that are expiring within the next 2 months."""
-    today = datetime.now().date()
+    today = datetime.combine(datetime.now().date(), datetime.min.time())
     two_months_later = today + relativedelta(months=2)
 
-    # Format dates as strings for MongoDB comparison
-    today_str = today.isoformat()
-    two_months_later_str = two_months_later.isoformat()
-
     # Query for projects ending within the next 2 months
     query = {
         "endDate": {
-            "$gte": today_str,
-            "$lte": two_months_later_str
+            "$gte": today,
+            "$lte": two_months_later
         }
     }
 
     cursor = projects_collection.find(query).sort(
         "endDate", ASCENDING).limit(15)
 
-    projects = []
-    for doc in cursor:
-        normalized = normalize_project(doc)
-        enriched = enrich_project_with_organizations(normalized)
-        projects.append(enriched)
+    projects = enrich_projects_with_organizations(
+        normalize_project(doc) for doc in cursor)
 
     return jsonify(projects)
 
 
 @projects_bp.route("/statistics/summary", methods=["GET"])
+@shared_result(result_store, dataset_version)
 def get_project_statistics():
     """Return summary statistics for the projects database."""
     try:
@@ -433,14 +283,7 @@ def get_project_statistics():
                 "$group": {
                     "_id": None,
                     "total_contribution": {
-                        "$sum": {
-                            "$convert": {
-                                "input": "$ecMaxContribution",
-                                "to": "double",
-                                "onError": 0,
-                                "onNull": 0
-                            }
-                        }
+                        "$sum": "$ecMaxContribution"
                     }
                 }
             }
@@ -471,14 +314,27 @@ def get_project_statistics():
 @projects_bp.route("/search", methods=["GET"])
 def search_projects():
     q = request.args.get("q", "").strip()
-    page = int(request.args.get("page", 1))
-    per_page = int(request.args.get("per_page", 10))
+    page = max(request.args.get("page", 1, type=int), 1)
+    per_page = page_size(request.args.get("per_page"), 10)
     skip = (page - 1) * per_page
 
+    mode = request.args.get("mode", "regex")
+    use_text_index = bool(q) and mode == "text"
+
     query = {}
 
+    # --- Ranked full-text search on the projects text index ---
+    if use_text_index:
+        if q.isdigit():
+            # Project IDs are not part of the text index
+            query["id"] = q
+            use_text_index = False
+        else:
+            query["$text"] = {"$search": build_text_search(
+                q, phrase=request.args.get("phrase") == "true")}
+
     # --- Smarter text search (order-independent) ---
-    if q:
+    elif q:
         terms = q.split()
 
         # OR conditions for the full query (exact phrase anywhere)
@@ -524,7 +380,10 @@ def search_projects():
                 {"keywords": {"$regex": k, "$options": "i"}} for k in keywords]
             keyword_query = {"$or": keyword_conditions}
 
-            if query:
+            if use_text_index:
+                # $text must stay at the top level of the query
+                query.update(keyword_query)
+            elif query:
                 query = {"$and": [query, keyword_query]}
             else:
                 query = keyword_query
@@ -550,12 +409,18 @@ def search_projects():
     if topics:
         query["topics"] = topics
 
+    countries = request.args.get("countries")
+    if countries:
+        allowed_countries = [c.strip() for c in countries.split(",") if c.strip()]
+        if allowed_countries:
+            query.update(countries_filter(allowed_countries))
+
     # --- Date filters ---
-    start_date = request.args.get("start_date")
+    start_date = parse_date(request.args.get("start_date"))
     if start_date:
         query["startDate"] = {"$gte": start_date}
 
-    end_date = request.args.get("end_date")
+    end_date = parse_date(request.args.get("end_date"))
     if end_date:
         query.setdefault("endDate", {})
         query["endDate"]["$lte"] = end_date
@@ -587,109 +452,87 @@ def search_projects():
             pass
 
     # --- Find matching projects ---
-    cursor = projects_collection.find(query).skip(skip).limit(per_page)
+    # Relevance order has no stable key, so text mode pages by number only
+    next_cursor = None
+    if use_text_index:
+        score = {"score": {"$meta": "textScore"}}
+        cursor = projects_collection.find(query, dict(HIDE_SYNC_FIELDS, **score)).sort(
+            [("score", score["score"])]).skip(skip).limit(per_page)
+    else:
+        try:
+            cursor, next_cursor = keyset_find(
+                projects_collection, query, per_page, request.args.get("cursor"), page,
+                HIDE_SYNC_FIELDS)
+        except InvalidCursor as e:
+            return jsonify({"error": str(e)}), 400
     results = []
 
-    for doc in cursor:
-        doc = serialize_doc(doc)
-        project_id = doc["id"]
-
-        # Fetch related organizations
-        organizations = []
-        for org in organizations_collection.find({"projectID": project_id}):
-            org_data = serialize_doc(org)
-
-            # Count how many projects this organization participates in
-            org_data["project_count"] = organizations_collection.count_documents({
-                "organisationID": org_data["organisationID"]
-            })
-
-            # Count how many projects this organization coordinates
-            org_data["coordinator_count"] = organizations_collection.count_documents({
-                "organisationID": org_data["organisationID"],
-                "role": {"$regex": "^coordinator$", "$options": "i"}
-            })
-
-            organizations.append(org_data)
-
-        # Filter by countries if provided
-        countries = request.args.get("countries")
-        if countries:
-            allowed_countries = set(countries.split(","))
-            org_countries = {org.get("country") for org in organizations}
-            if org_countries.isdisjoint(allowed_countries):
-                continue  # Skip project if no matching country
-
-        # Find coordinator
-        coordinator = next(
-            (org for org in organizations if org.get(
-                "role", "").lower() == "coordinator"),
-            None
-        )
-
-        # Remove coordinator from organizations list
-        organizations = [org for org in organizations if org.get(
-            "role", "").lower() != "coordinator"]
+    docs = [serialize_doc(doc) for doc in cursor]
+    keywords_per_doc = get_projects_keywords(docs)
 
+    for doc, keywords in zip(enrich_projects_with_organizations(docs), keywords_per_doc):
         # Add enhanced keywords
-        doc["extracted_keywords"] = extract_project_keywords(doc)[
-            :10]  # Top 10 keywords
-
-        # Add objective summary if requested
-        if request.args.get('include_summary') == 'true' and doc.get("objective"):
-            doc["objective_summary"] = summarize_objective(doc["objective"])
-
-        doc["coordinator"] = coordinator
-        doc["organizations"] = organizations
+        doc.pop("extracted_keywords_hash", None)
+        doc["extracted_keywords"] = keywords[:10]  # Top 10 keywords
 
         results.append(doc)
 
-    total_count = projects_collection.count_documents(query)
+    # Add objective summaries if requested, resolving the whole page at once
+    if request.args.get('include_summary') == 'true':
+        with_objective = [doc for doc in results if doc.get("objective")]
+        summaries = summary_cache.get_many(
+            [doc["objective"] for doc in with_objective], summarize_objective)
+        for doc, summary in zip(with_objective, summaries):
+            doc["objective_summary"] = summary
+
+    has_more = next_cursor is not None if not use_text_index else len(docs) == per_page
+    count, capped = result_count(
+        result_store, dataset_version, projects_collection, query, len(docs), page, per_page,
+        cursor=request.args.get("cursor"), exact=request.args.get("exact") == "true")
+    total, pages = page_total(count, capped, page, per_page, has_more)
 
     return jsonify({
         "projects": results,
-        "total": total_count,
+        "total": total,
+        "total_capped": capped,
         "page": page,
-        "pages": (total_count + per_page - 1) // per_page,
-        "per_page": per_page
+        "pages": pages,
+        "per_page": per_page,
+        "next_cursor": next_cursor,
+        "mode": "text" if use_text_index else "regex"
     })
 
 
+@projects_bp.route("/batch", methods=["GET"])
+def get_projects_batch():
+    """
+    Return several projects by id, in the requested order, with one `$in`
+    query and batched enrichment.
+    Example: /api/projects/batch?ids=101046203,101057437&fields=organizations
+    """
+    ids = parse_id_list(request.args.get("ids", ""))
+    if not ids:
+        return jsonify({"error": "Missing 'ids' parameter"}), 400
+    if len(ids) > MAX_BATCH_IDS:
+        return jsonify({"error": f"At most {MAX_BATCH_IDS} ids per request"}), 400
+
+    try:
+        sections = parse_sections(request.args.get("fields"))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    projects, missing = fetch_projects(ids, sections)
+    return jsonify({"projects": projects, "missing": missing})
+
+
 @projects_bp.route("/<project_id>", methods=["GET"])
 def get_project(project_id):
     """Return a single project with its organizations and coordinator."""
-    project = db.projects.find_one({"id": project_id})
+    project = db.projects.find_one({"id": project_id}, HIDE_SYNC_FIELDS)
     if not project:
         return jsonify({"error": "Project not found"}), 404
 
-    project = convert_objectid(project)
-    enriched = enrich_project_with_organizations(project)
-
-    # Add enhanced keywords
-    enriched["extracted_keywords"] = extract_project_keywords(project)
-
-    # Always provide objective summary data structure
-    if project.get("objective"):
-        summary = summarize_objective(project["objective"])
-        enriched["objective_data"] = {
-            "full_text": project["objective"],
-            "summary": summary,
-            "has_summary": summary is not None,
-            "original_length": len(project["objective"]),
-            "summary_length": len(summary) if summary else 0,
-            "compression_ratio": round(len(summary) / len(project["objective"]) * 100, 1) if summary else 0
-        }
-    else:
-        enriched["objective_data"] = {
-            "full_text": None,
-            "summary": None,
-            "has_summary": False,
-            "original_length": 0,
-            "summary_length": 0,
-            "compression_ratio": 0
-        }
-
-    return jsonify(enriched)
+    return jsonify(expand_projects([project], PROJECT_SECTIONS)[0])
 
 
 # === NEW KEYWORD-SPECIFIC ENDPOINTS ===
@@ -699,7 +542,13 @@ def get_trending_keywords_endpoint():
     """Get most popular keywords across projects."""
     try:
         limit = min(int(request.args.get("limit", 50)), 100)
-        keywords = get_trending_keywords(limit)
+        year = request.args.get("year", type=int)
+        keywords = get_trending_keywords(
+            limit,
+            programme=request.args.get("programme"),
+            year=year,
+            status=request.args.get("status")
+        )
         return jsonify({
             "keywords": keywords,
             "total": len(keywords)
@@ -731,7 +580,7 @@ def get_project_keywords_endpoint(project_id):
         if not project:
             return jsonify({"error": "Project not found"}), 404
 
-        keywords = extract_project_keywords(project)
+        keywords = get_project_keywords(project)
         return jsonify({
             "project_id": project_id,
             "keywords": keywords,
@@ -741,6 +590,12 @@ def get_project_keywords_endpoint(project_id):
         return jsonify({"error": str(e)}), 500
 
 
+@projects_bp.route("/summaries/stats", methods=["GET"])
+def get_summary_cache_stats():
+    """Report hit/miss counters of this worker's summary cache."""
+    return jsonify(summary_cache.stats())
+
+
 @projects_bp.route("/<project_id>/summary", methods=["GET"])
 def get_project_summary(project_id):
     """Generate AI summary for a project's objective."""
@@ -753,7 +608,7 @@ def get_project_summary(project_id):
         if not objective:
             return jsonify({"error": "No objective available"}), 404
 
-        summary = summarize_objective(objective)
+        summary = get_objective_summary(objective)
 
         return jsonify({
             "project_id": project_id,
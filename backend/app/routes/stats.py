@@ -1,29 +1,20 @@
 # app/routes/stats.py
 from flask import Blueprint, jsonify, request
-import os
-from bson import Decimal128
-from pymongo import MongoClient
 import re
 from pymongo.errors import PyMongoError
 
+from app.db import db
+from app.util.dataset import DatasetVersion
+from app.util.result_store import result_store, shared_result
+
 
-mongo_client = MongoClient(os.getenv("MONGOURL"))
-db = mongo_client["cordis_db"]
 projects_collection = db["projects"]
 organizations_collection = db["organizations"]
+dataset_version = DatasetVersion(db["meta"])
 
 stats_bp = Blueprint("stats", __name__)
 
 
-def _parse_float(val):
-    if isinstance(val, Decimal128):
-        return float(val.to_decimal())
-    try:
-        return float(str(val).replace(",", "").strip()) if val not in (None, "") else 0.0
-    except Exception:
-        return 0.0
-
-
 # Add this decorator to handle MongoDB errors
 def handle_mongo_errors(func):
     def wrapper(*args, **kwargs):
@@ -57,6 +48,7 @@ def health_check():
 
 
 @stats_bp.route("/projects_by_country", methods=["GET"])
+@shared_result(result_store, dataset_version)
 @handle_mongo_errors
 def projects_by_country():
     pipeline = [
@@ -80,6 +72,7 @@ def projects_by_country():
 
 
 @stats_bp.route("/projects_per_programme", methods=["GET"])
+@shared_result(result_store, dataset_version)
 def projects_per_programme():
     # Use masterCall instead of frameworkProgramme
     pipeline = [
@@ -103,34 +96,16 @@ def projects_per_programme():
 
 
 @stats_bp.route("/eu_contribution_per_country", methods=["GET"])
+@shared_result(result_store, dataset_version)
 def eu_contribution_per_country():
     pipeline = [
         {"$match": {
             "country": {"$exists": True, "$ne": None},
-            "ecContribution": {"$exists": True, "$ne": None, "$ne": ""}
-        }},
-        {"$addFields": {
-            "cleaned_contribution": {
-                "$replaceOne": {
-                    "input": "$ecContribution",
-                    "find": ",",
-                    "replacement": "."
-                }
-            }
-        }},
-        {"$addFields": {
-            "numeric_contribution": {
-                "$convert": {
-                    "input": "$cleaned_contribution",
-                    "to": "double",
-                    "onError": 0.0,
-                    "onNull": 0.0
-                }
-            }
+            "ecContribution": {"$type": "number"}
         }},
         {"$group": {
             "_id": "$country",
-            "total_contribution": {"$sum": "$numeric_contribution"}
+            "total_contribution": {"$sum": "$ecContribution"}
         }},
         {"$project": {
             "country": "$_id",
@@ -150,12 +125,13 @@ def eu_contribution_per_country():
 
 
 @stats_bp.route("/projects_over_time", methods=["GET"])
+@shared_result(result_store, dataset_version)
 @handle_mongo_errors
 def projects_over_time():
     pipeline = [
-        {"$match": {"startDate": {"$exists": True, "$ne": None}}},
+        {"$match": {"startDate": {"$type": "date"}}},
         {"$addFields": {
-            "year": {"$substr": ["$startDate", 0, 4]}
+            "year": {"$toString": {"$year": "$startDate"}}
         }},
         {"$group": {
             "_id": "$year",
@@ -176,6 +152,7 @@ def projects_over_time():
 
 
 @stats_bp.route("/top_organizations", methods=["GET"])
+@shared_result(result_store, dataset_version)
 def top_organizations():
     limit = request.args.get("limit", 10, type=int)
 
@@ -235,14 +212,12 @@ def top_organizations():
 
 
 @stats_bp.route("/top_projects_by_eu_contribution", methods=["GET"])
+@shared_result(result_store, dataset_version)
 @handle_mongo_errors
 def top_projects_by_eu_contribution():
+    # Sorted on the stored double, so the ecMaxContribution index serves it
     pipeline = [
-        {"$project": {
-            "acronym": 1,
-            "ecMaxContribution": {"$toDouble": "$ecMaxContribution"},
-            "title": 1
-        }},
+        {"$match": {"ecMaxContribution": {"$type": "number"}}},
         {"$sort": {"ecMaxContribution": -1}},
         {"$limit": 15},
         {"$project": {
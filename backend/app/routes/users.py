@@ -1,6 +1,7 @@
 from flask import Blueprint, jsonify, g, request
 from app.middleware.clerk import require_auth
 from app.models import UserModel
+from app.util.project_details import MAX_BATCH_IDS, fetch_projects, parse_sections
 
 users_bp = Blueprint('users', __name__)
 
@@ -37,10 +38,33 @@ def get_current_user():
 @users_bp.route('/favorites', methods=['GET'])
 @require_auth
 def get_favorites():
-    """Get user's favorite project IDs"""
+    """
+    Get user's favorite project IDs. With expand=true the projects are
+    included in favorites order, fetched in one batch (see /api/projects/batch
+    for the `fields` parameter, which defaults to organizations here).
+    Expanding is limited to MAX_BATCH_IDS favorites, like the batch endpoint.
+    """
     user_model = UserModel()
     favorites = user_model.get_favorites(g.clerk_user_id)
-    return jsonify({"favorites": favorites}), 200
+
+    if request.args.get('expand') != 'true':
+        return jsonify({"favorites": favorites}), 200
+
+    if len(favorites) > MAX_BATCH_IDS:
+        return jsonify({"error": f"At most {MAX_BATCH_IDS} favorites can be expanded; "
+                                 f"use /api/projects/batch in chunks"}), 400
+
+    try:
+        sections = parse_sections(request.args.get('fields', 'organizations'))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    projects, missing = fetch_projects(favorites, sections) if favorites else ([], [])
+    return jsonify({
+        "favorites": favorites,
+        "projects": projects,
+        "missing": missing
+    }), 200
 
 
 @users_bp.route('/favorites/<project_id>', methods=['POST'])
@@ -2,118 +2,890 @@ import requests
 import zipfile
 import io
 import csv
-from pymongo import MongoClient, TEXT
-from flask import current_app
+import hashlib
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from urllib.parse import unquote, urlparse
+from urllib.request import url2pathname
+from pymongo import InsertOne, UpdateMany, UpdateOne
+
+from app.db import get_database
+from app.util.dataset import bump_dataset_version
+from app.util.indexes import APP_COLLECTIONS, SYNC_COLLECTIONS, ensure_indexes
+from app.util.keyword_stats import apply_keyword_stats_delta, rebuild_keyword_stats
+from app.util.nlp import keywords_content_hash
+from app.util.schema import SCHEMA_VERSION, apply_schema
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
 
 CORDIS_ZIP_URL = "https://cordis.europa.eu/data/cordis-HORIZONprojects-csv.zip"
-BATCH_SIZE = 1000
+BATCH_SIZE = int(os.getenv("SYNC_BATCH_SIZE", 1000))
+# Bulk writes kept in flight at once across all collections
+SYNC_CONCURRENCY = int(os.getenv("SYNC_CONCURRENCY", 4))
+
+# Blue/green generations: loads go to *_staging, the live generation is
+# kept as *_previous for rollback
+STAGING_SUFFIX = "_staging"
+PREVIOUS_SUFFIX = "_previous"
+SWAP_COLLECTIONS = ["projects", "organizations", "topics",
+                    "organization_stats", "keyword_stats"]
+REQUIRED_COLLECTIONS = {"projects", "organizations"}
+MIN_RETAINED_FRACTION = 0.5
+
+# CSV prefix -> (collection, fields identifying a row across releases)
+SOURCES = {
+    "project": ("projects", ("id",)),
+    "organization": ("organizations", ("projectID", "organisationID", "order")),
+    "topics": ("topics", ("projectID", "topic")),
+}
+
+# Project fields read when a delta needs the previous version of a row
+PROJECT_DELTA_FIELDS = {
+    "_rowKey": 1, "_rowHash": 1, "_syncGeneration": 1, "id": 1, "title": 1, "objective": 1,
+    "keywords": 1, "frameworkProgramme": 1, "startDate": 1, "status": 1,
+    "extracted_keywords": 1
+}
+DOWNLOAD_CHUNK_SIZE = 1024 * 1024
+# Remote archives are cached here with their HTTP validators and checksum
+SYNC_CACHE_DIR = os.getenv(
+    "SYNC_CACHE_DIR", os.path.join(tempfile.gettempdir(), "nexora-cordis-cache"))
+ARCHIVE_NAME = "cordis-HORIZONprojects-csv.zip"
+ARCHIVE_META_NAME = "archive.json"
+
+
+def no_progress(phase, **fields):
+    """Default progress callback: sync steps report `phase` plus counters."""
+
+
+def sha256_file(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(DOWNLOAD_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
 
+def local_archive_path(source):
+    """The filesystem path for a local path or file:// URL, else None."""
+    parsed = urlparse(source)
+    if parsed.scheme == "file":
+        return url2pathname(unquote(parsed.path))
+    if parsed.scheme in ("http", "https"):
+        return None
+    return source
 
-def download_zip(url):
-    """Download zip file and return bytes."""
-    response = requests.get(url)
-    response.raise_for_status()
-    return io.BytesIO(response.content)
 
+def _read_archive_meta(cache_dir):
+    try:
+        with open(os.path.join(cache_dir, ARCHIVE_META_NAME)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
 
-def read_csv_from_zip(zip_bytes, filename_prefix):
+
+def _write_archive_meta(cache_dir, meta):
+    path = os.path.join(cache_dir, ARCHIVE_META_NAME)
+    with open(path + ".tmp", "w") as f:
+        json.dump(meta, f, indent=2)
+    os.replace(path + ".tmp", path)
+
+
+def fetch_archive(source, cache_dir=SYNC_CACHE_DIR, progress=no_progress):
     """
-    Extract CSV from zip with a given prefix ('project' or 'organization').
-    Returns list of dicts.
+    Return (path, sha256, downloaded) for the CORDIS archive.
+
+    Local paths and file:// URLs are used in place. Remote archives are kept
+    in `cache_dir` with their ETag, Last-Modified and checksum: a conditional
+    request skips the transfer when the server copy is unchanged, and an
+    interrupted download is resumed from its .part file with a Range request.
     """
-    docs = []
-    with zipfile.ZipFile(zip_bytes) as z:
+    local_path = local_archive_path(source)
+    if local_path is not None:
+        if not os.path.isfile(local_path):
+            raise FileNotFoundError(f"CORDIS archive not found: {local_path}")
+        return local_path, sha256_file(local_path), False
+
+    os.makedirs(cache_dir, exist_ok=True)
+    archive_path = os.path.join(cache_dir, ARCHIVE_NAME)
+    part_path = archive_path + ".part"
+    meta = _read_archive_meta(cache_dir)
+    if meta.get("url") != source:
+        meta = {}
+
+    headers = {}
+    cached = bool(meta) and os.path.isfile(archive_path)
+    if cached:
+        if meta.get("etag"):
+            headers["If-None-Match"] = meta["etag"]
+        if meta.get("last_modified"):
+            headers["If-Modified-Since"] = meta["last_modified"]
+
+    partial = meta.get("partial") or {}
+    offset = os.path.getsize(part_path) if os.path.isfile(part_path) else 0
+    validator = partial.get("etag") or partial.get("last_modified")
+    if offset and validator:
+        # If-Range makes the server send the whole file if it changed since
+        headers["Range"] = f"bytes={offset}-"
+        headers["If-Range"] = validator
+    else:
+        offset = 0
+
+    with requests.get(source, headers=headers, stream=True, timeout=60) as response:
+        if response.status_code == 304 and cached:
+            print("📦 CORDIS archive not modified, using the cached copy.")
+            return archive_path, meta["sha256"], False
+        response.raise_for_status()
+
+        etag = response.headers.get("ETag")
+        last_modified = response.headers.get("Last-Modified")
+        resumed = response.status_code == 206 and offset > 0
+        if resumed:
+            print(f"⏯️ Resuming CORDIS download at {offset / 1e6:.1f} MB...")
+
+        # Keep the url with the validators so the next run can resume
+        meta = dict(meta, url=source, partial={"etag": etag, "last_modified": last_modified})
+        _write_archive_meta(cache_dir, meta)
+
+        received = offset if resumed else 0
+        with open(part_path, "ab" if resumed else "wb") as f:
+            for chunk in response.iter_content(DOWNLOAD_CHUNK_SIZE):
+                f.write(chunk)
+                received += len(chunk)
+                progress("fetch", bytes=received)
+
+    sha256 = sha256_file(part_path)
+    os.replace(part_path, archive_path)
+    _write_archive_meta(cache_dir, {
+        "url": source,
+        "etag": etag,
+        "last_modified": last_modified,
+        "sha256": sha256,
+        "size": os.path.getsize(archive_path),
+        "downloaded_at": datetime.utcnow().isoformat()
+    })
+    return archive_path, sha256, True
+
+
+def iter_csv_from_zip(zip_path, filename_prefix):
+    """
+    Stream rows of the CSV in the zip whose name starts with the given
+    prefix ('project', 'organization', ...). Yields dicts one at a time.
+    """
+    with zipfile.ZipFile(zip_path) as z:
         # Find the first CSV file matching prefix
         csv_name = next((name for name in z.namelist()
                         if name.lower().startswith(filename_prefix)), None)
         if not csv_name:
             print(f"⚠️ No {filename_prefix} CSV found in zip!")
-            return docs
+            return
         with z.open(csv_name) as f:
             # Detect delimiter (usually ';')
             text = io.TextIOWrapper(f, encoding="utf-8")
-            reader = csv.DictReader(text, delimiter=';')
-            for row in reader:
-                docs.append(row)
-    return docs
+            yield from csv.DictReader(text, delimiter=';')
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process in MB, if the platform reports it."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
 
 
-def clean_document(doc: dict) -> dict:
-    """Remove invalid keys (None), strip whitespace, and normalize numeric fields."""
+def clean_document(doc: dict, collection: str) -> dict:
+    """Remove invalid keys (None), strip whitespace, and apply the collection's schema."""
     cleaned = {}
     for k, v in doc.items():
         if k is None:
             continue
 
         key = k.strip()
-        value = v.strip() if isinstance(v, str) else v
-
-        # Convert ecMaxContribution and totalCost to float if possible
-        if key in ["ecMaxContribution", "totalCost"] and isinstance(value, str):
-            try:
-                # Replace comma with dot (e.g., "226276,8" -> "226276.8")
-                cleaned[key] = float(value.replace(",", "."))
-            except ValueError:
-                cleaned[key] = 0.0  # fallback if empty or invalid
+        cleaned[key] = v.strip() if isinstance(v, str) else v
+
+    return apply_schema(cleaned, collection)
+
+
+def source_collection(collection):
+    """The live collection name behind a (possibly staging) collection."""
+    name = collection.name
+    return name[:-len(STAGING_SUFFIX)] if name.endswith(STAGING_SUFFIX) else name
+
+
+def row_key(doc, key_fields):
+    return "|".join(str(doc.get(field, "")) for field in key_fields)
+
+
+def with_row_hash(doc, key_fields):
+    """
+    Add `_rowKey`, which identifies the row across CORDIS releases, and
+    `_rowHash`, a stable hash of its cleaned content.
+    """
+    content = json.dumps(doc, sort_keys=True, default=str, ensure_ascii=False)
+    doc["_rowKey"] = row_key(doc, key_fields)
+    doc["_rowHash"] = hashlib.sha1(content.encode("utf-8")).hexdigest()
+    return doc
+
+
+class BulkLoader:
+    """
+    Loads several CSV streams at once. Reader threads cut each stream into
+    batches; a shared pool cleans every batch and writes it with an
+    unordered insert_many, with up to `concurrency` batches in flight per
+    stream. Per-batch latency is recorded for the throughput report.
+    """
+
+    def __init__(self, batch_size=None, concurrency=None, progress=no_progress):
+        self.batch_size = batch_size or BATCH_SIZE
+        self.concurrency = concurrency or SYNC_CONCURRENCY
+        self.progress = progress
+        self.batches = []
+        self.rows = 0
+        self._lock = threading.Lock()
+
+    def _write_batch(self, collection, rows, key_fields):
+        started = time.perf_counter()
+        name = source_collection(collection)
+        docs = [with_row_hash(clean_document(row, name), key_fields) for row in rows]
+        collection.insert_many(docs, ordered=False)
+        elapsed = time.perf_counter() - started
+        with self._lock:
+            self.batches.append((collection.name, len(docs), elapsed))
+            self.rows += len(docs)
+            rows = self.rows
+        self.progress("load", rows=rows)
+        return len(docs)
+
+    def _load_stream(self, executor, collection, rows, key_fields):
+        started = time.perf_counter()
+        in_flight = threading.BoundedSemaphore(self.concurrency)
+        futures = []
+        batch = []
+
+        def submit(batch):
+            in_flight.acquire()
+            future = executor.submit(self._write_batch, collection, batch, key_fields)
+            future.add_done_callback(lambda _: in_flight.release())
+            futures.append(future)
+
+        for row in rows:
+            batch.append(row)
+            if len(batch) >= self.batch_size:
+                submit(batch)
+                batch = []
+        if batch:
+            submit(batch)
+
+        loaded = sum(future.result() for future in futures)
+        return loaded, time.perf_counter() - started
+
+    def load(self, streams):
+        """
+        Load {collection: (rows, key_fields)} concurrently.
+        Returns {collection name: (rows loaded, seconds)}.
+        """
+        with ThreadPoolExecutor(self.concurrency * len(streams)) as executor, \
+                ThreadPoolExecutor(len(streams)) as readers:
+            futures = {
+                collection.name: readers.submit(
+                    self._load_stream, executor, collection, rows, key_fields)
+                for collection, (rows, key_fields) in streams.items()
+            }
+            results = {name: future.result() for name, future in futures.items()}
+
+        for name, (rows, seconds) in results.items():
+            rate = rows / seconds if seconds else 0.0
+            print(f"✅ Loaded {rows} rows into {name} in {seconds:.1f}s ({rate:.0f} rows/s).")
+        return results
+
+    def report(self):
+        latencies = sorted(seconds for _, _, seconds in self.batches)
+        if not latencies:
+            return {"batches": 0}
+
+        def percentile(p):
+            return round(latencies[min(len(latencies) - 1, int(len(latencies) * p))], 3)
+
+        return {
+            "batches": len(latencies),
+            "batch_size": self.batch_size,
+            "concurrency": self.concurrency,
+            "batch_seconds_p50": percentile(0.5),
+            "batch_seconds_p95": percentile(0.95),
+            "batch_seconds_max": round(latencies[-1], 3)
+        }
+
+
+class DeltaResult:
+    """Counts and affected keys of one delta load."""
+
+    def __init__(self, track_fields):
+        self.counts = {"inserted": 0, "updated": 0,
+                       "deleted": 0, "unchanged": 0, "duplicates": 0}
+        self.affected = {field: set() for field in track_fields}
+        self.changes = []
+
+    def track(self, doc):
+        for field, values in self.affected.items():
+            if doc.get(field):
+                values.add(doc[field])
+
+
+def _flush_delta(collection, batch, result, old_fields, generation):
+    keys = [doc["_rowKey"] for doc in batch]
+    existing = {row["_rowKey"]: row for row in collection.find(
+        {"_rowKey": {"$in": keys}}, old_fields)}
+
+    ops = []
+    unchanged = []
+    for doc in batch:
+        old = existing.get(doc["_rowKey"])
+        if old is not None and old.get("_syncGeneration") == generation:
+            # Already written by this sync: a repeated key in the CSV
+            result.counts["duplicates"] += 1
+            continue
+        doc["_syncGeneration"] = generation
+        if old is None:
+            ops.append(InsertOne(doc))
+            result.counts["inserted"] += 1
+        elif old.get("_rowHash") == doc["_rowHash"]:
+            unchanged.append(doc["_rowKey"])
+            existing[doc["_rowKey"]] = {"_syncGeneration": generation}
+            result.counts["unchanged"] += 1
+            continue
         else:
-            cleaned[key] = value
+            update = {"$set": doc}
+            new = dict(doc, extracted_keywords=old.get("extracted_keywords"))
+            if "extracted_keywords" in old and \
+                    keywords_content_hash(old) != keywords_content_hash(doc):
+                # Stale keywords are recomputed lazily on next read
+                update["$unset"] = {"extracted_keywords": "", "extracted_keywords_hash": ""}
+                new.pop("extracted_keywords")
+            ops.append(UpdateOne({"_rowKey": doc["_rowKey"]}, update))
+            result.counts["updated"] += 1
+            result.track(old)
+
+        # Later rows of the batch with the same key are duplicates
+        existing[doc["_rowKey"]] = {"_syncGeneration": generation}
+        result.track(doc)
+        if result.changes is not None:
+            result.changes.append((old, new if old is not None else doc))
+
+    if unchanged:
+        ops.append(UpdateMany({"_rowKey": {"$in": unchanged}},
+                              {"$set": {"_syncGeneration": generation}}))
+    if ops:
+        collection.bulk_write(ops, ordered=False)
+
 
-    return cleaned
+def delta_load(collection, docs, key_fields, track_fields=(), collect_changes=False,
+               progress=no_progress):
+    """
+    Apply one CSV to a live collection as a delta: rows are matched on
+    `_rowKey`, and only new or changed rows (by `_rowHash`) are written, with
+    unordered bulk upserts. Every row of the CSV is stamped with this sync's
+    `_syncGeneration` (unchanged rows with one update per batch), so rows
+    that disappeared from the CSV are the ones left with another generation
+    and are deleted.
 
+    Deletes are refused, with a RuntimeError, when the CSV yielded no rows
+    or would remove more than 1 - MIN_RETAINED_FRACTION of the collection,
+    the same bar validate_staging sets for a full sync.
+    """
+    result = DeltaResult(track_fields)
+    if not collect_changes:
+        result.changes = None
+    old_fields = PROJECT_DELTA_FIELDS if collect_changes else \
+        dict({"_rowKey": 1, "_rowHash": 1, "_syncGeneration": 1}, **{f: 1 for f in track_fields})
+    generation = uuid.uuid4().hex
+    existing_rows = collection.estimated_document_count()
 
-def insert_batch(collection, docs):
-    """Insert documents in batches to avoid memory issues."""
+    rows = 0
     batch = []
     for doc in docs:
-        cleaned = clean_document(doc)
-        batch.append(cleaned)
+        batch.append(with_row_hash(clean_document(doc, collection.name), key_fields))
+        rows += 1
         if len(batch) >= BATCH_SIZE:
-            collection.insert_many(batch)
+            _flush_delta(collection, batch, result, old_fields, generation)
+            batch = []
+            progress("delta", collection=collection.name, rows=rows)
+    if batch:
+        _flush_delta(collection, batch, result, old_fields, generation)
+
+    stale_query = {"_syncGeneration": {"$ne": generation}}
+    if existing_rows and not rows:
+        raise RuntimeError(
+            f"Delta rejected: {collection.name} CSV has no rows, live has {existing_rows}")
+    stale_rows = collection.count_documents(stale_query)
+    if existing_rows and stale_rows > existing_rows * (1 - MIN_RETAINED_FRACTION):
+        raise RuntimeError(
+            f"Delta rejected: {collection.name} would delete {stale_rows} "
+            f"of {existing_rows} rows")
+
+    stale = []
+    for row in collection.find(stale_query, old_fields):
+        stale.append(row["_id"])
+        result.track(row)
+        if result.changes is not None:
+            result.changes.append((row, None))
+        if len(stale) >= BATCH_SIZE:
+            result.counts["deleted"] += collection.delete_many({"_id": {"$in": stale}}).deleted_count
+            stale = []
+    if stale:
+        result.counts["deleted"] += collection.delete_many({"_id": {"$in": stale}}).deleted_count
+
+    return result
+
+
+def has_row_hashes(db):
+    return db["projects"].find_one({"_rowHash": {"$exists": True}}, {"_id": 1}) is not None
+
+
+def missing_csvs(zip_path):
+    """CSV prefixes of SOURCES that the archive has no file for."""
+    with zipfile.ZipFile(zip_path) as z:
+        names = [name.lower() for name in z.namelist()]
+    return [prefix for prefix in SOURCES
+            if not any(name.startswith(prefix) for name in names)]
+
+
+def sync_delta(db, zip_path, progress=no_progress):
+    """
+    Apply a CORDIS release to the live collections as a delta. An archive
+    missing one of the CSVs is refused before anything is written.
+
+    Unlike a full sync this is not a generation switch: readers see the
+    release land batch by batch (inserts and updates first, deletes last),
+    and *_previous is left as the full sync saved it, which sync_cordis
+    records in `deltasSincePrevious` so rollbacks can refuse to drop deltas.
+    """
+    missing = missing_csvs(zip_path)
+    if missing:
+        raise RuntimeError(f"Delta rejected: archive has no {', '.join(missing)} CSV")
+
+    results = {}
+    for prefix, (name, key_fields) in SOURCES.items():
+        started = time.perf_counter()
+        track_fields = ("id",) if prefix == "project" else ("projectID", "organisationID")
+        results[name] = delta_load(
+            db[name], iter_csv_from_zip(zip_path, prefix), key_fields,
+            track_fields=track_fields, collect_changes=(prefix == "project"),
+            progress=progress)
+        print(f"✅ {name}: {results[name].counts} in {time.perf_counter() - started:.1f}s")
+
+    affected_projects = set(results["projects"].affected["id"])
+    affected_organisations = set()
+    for name in ("organizations", "topics"):
+        affected_projects |= results[name].affected["projectID"]
+    affected_organisations |= results["organizations"].affected["organisationID"]
+    if affected_projects:
+        # Stats carry project dates, so participants of changed projects count too
+        affected_organisations |= set(db["organizations"].distinct(
+            "organisationID", {"projectID": {"$in": list(affected_projects)}}))
+    affected_organisations.discard(None)
+    affected_organisations.discard("")
+
+    progress("indexes")
+    ensure_indexes(db, SYNC_COLLECTIONS)
+
+    progress("derived")
+    if affected_projects:
+        print(f"🌍 Refreshing countries of {len(affected_projects)} projects...")
+        build_project_countries(db, project_ids=affected_projects)
+    if affected_organisations:
+        print(f"📊 Refreshing statistics of {len(affected_organisations)} organizations...")
+        build_organization_stats(db, organisation_ids=affected_organisations)
+    if results["projects"].changes:
+        apply_keyword_stats_delta(db["keyword_stats"], results["projects"].changes)
+
+    return {
+        "counts": {name: result.counts for name, result in results.items()},
+        "affected_project_ids": sorted(affected_projects),
+        "affected_organisation_ids": len(affected_organisations)
+    }
+
+
+def build_project_countries(db, suffix="", project_ids=None):
+    """
+    Write the set of participant countries onto each project as `countries`,
+    so country filters can be part of the projects query.
+    """
+    projects_collection = db["projects" + suffix]
+    match = {"projectID": {"$nin": [None, ""]}, "country": {"$nin": [None, ""]}}
+    if project_ids is not None:
+        project_ids = list(project_ids)
+        match["projectID"] = {"$in": project_ids}
+        # Projects that lost all their participants end up with no countries
+        projects_collection.update_many(
+            {"id": {"$in": project_ids}}, {"$set": {"countries": []}})
+
+    pipeline = [
+        {"$match": match},
+        {"$group": {"_id": "$projectID", "countries": {"$addToSet": "$country"}}}
+    ]
+
+    updated = 0
+    batch = []
+    for row in db["organizations" + suffix].aggregate(pipeline, allowDiskUse=True):
+        batch.append(UpdateOne(
+            {"id": row["_id"]}, {"$set": {"countries": sorted(row["countries"])}}))
+        if len(batch) >= BATCH_SIZE:
+            updated += projects_collection.bulk_write(batch, ordered=False).modified_count
             batch.clear()
     if batch:
-        collection.insert_many(batch)
+        updated += projects_collection.bulk_write(batch, ordered=False).modified_count
 
+    projects_collection.create_index("countries")
+    return updated
 
-def sync_cordis():
-    """Main function to sync CORDIS data into MongoDB."""
-    mongo_uri = current_app.config["MONGO_URI"]
-    client = MongoClient(mongo_uri)
-    db = client["cordis_db"]
 
-    projects_collection = db["projects"]
-    organizations_collection = db["organizations"]
+def build_organization_stats(db, suffix="", organisation_ids=None):
+    """
+    Materialize per-organization participation statistics into the
+    `organization_stats` collection, keyed by organisationID. With
+    `organisation_ids` only those organizations are recomputed and merged.
+    """
+    match = {"organisationID": {"$nin": [None, ""]}}
+    if organisation_ids is not None:
+        organisation_ids = list(organisation_ids)
+        match = {"organisationID": {"$in": organisation_ids}}
 
-    print("⬇️ Downloading CORDIS zip file...")
-    zip_bytes = download_zip(CORDIS_ZIP_URL)
+    pipeline = [
+        {"$match": match},
+        {"$lookup": {
+            "from": "projects" + suffix,
+            "localField": "projectID",
+            "foreignField": "id",
+            "pipeline": [{"$project": {"_id": 0, "startDate": 1, "endDate": 1}}],
+            "as": "project"
+        }},
+        {"$set": {"project": {"$first": "$project"}}},
+        {"$group": {
+            "_id": "$organisationID",
+            "name": {"$last": "$name"},
+            "project_count": {"$sum": 1},
+            "coordinator_count": {"$sum": {
+                "$cond": [
+                    {"$eq": [{"$toLower": {"$ifNull": ["$role", ""]}},
+                             "coordinator"]},
+                    1,
+                    0
+                ]
+            }},
+            "total_ec_contribution": {"$sum": "$ecContribution"},
+            "countries": {"$addToSet": "$country"},
+            "first_project_date": {"$min": "$project.startDate"},
+            "last_project_date": {"$max": "$project.endDate"}
+        }},
+        {"$project": {
+            "_id": 0,
+            "organisationID": "$_id",
+            "name": 1,
+            "project_count": 1,
+            "coordinator_count": 1,
+            "total_ec_contribution": 1,
+            "countries": {"$filter": {
+                "input": "$countries",
+                "cond": {"$not": [{"$in": ["$$this", [None, ""]]}]}
+            }},
+            "first_project_date": 1,
+            "last_project_date": 1
+        }},
+        {"$out": "organization_stats" + suffix}
+    ]
+    stats_collection = db["organization_stats" + suffix]
 
-    print("📂 Extracting projects CSV...")
-    projects = read_csv_from_zip(zip_bytes, "project")
-    print(f"✅ Found {len(projects)} projects.")
+    if organisation_ids is None:
+        db["organizations" + suffix].aggregate(pipeline, allowDiskUse=True)
+        ensure_indexes(db, ["organization_stats"], suffix)
+        return stats_collection.estimated_document_count()
 
-    print("📂 Extracting organizations CSV...")
-    organizations = read_csv_from_zip(zip_bytes, "organization")
-    print(f"✅ Found {len(organizations)} organizations.")
+    pipeline[-1] = {"$merge": {
+        "into": stats_collection.name,
+        "on": "organisationID",
+        "whenMatched": "replace",
+        "whenNotMatched": "insert"
+    }}
+    db["organizations" + suffix].aggregate(pipeline, allowDiskUse=True)
 
-    print("🗑 Dropping old collections...")
-    projects_collection.drop()
-    organizations_collection.drop()
+    # Organizations without any remaining participation
+    remaining = set(db["organizations" + suffix].distinct(
+        "organisationID", {"organisationID": {"$in": organisation_ids}}))
+    gone = [org_id for org_id in organisation_ids if org_id not in remaining]
+    if gone:
+        stats_collection.delete_many({"organisationID": {"$in": gone}})
+    return len(organisation_ids)
 
-    print("💾 Inserting new data...")
-    insert_batch(projects_collection, projects)
-    insert_batch(organizations_collection, organizations)
 
-    print("📈 Creating indexes...")
-    projects_collection.create_index(
-        [("title", TEXT), ("acronym", TEXT), ("objective", TEXT)])
-    organizations_collection.create_index(
-        [("organization_name", TEXT), ("acronym", TEXT)])
-    projects_collection.create_index("startDate")
-    projects_collection.create_index("endDate")
-    projects_collection.create_index("ecMaxContribution")
+def carry_over_keywords(db, suffix=STAGING_SUFFIX):
+    """
+    Copy `extracted_keywords` from live projects onto their reloaded rows in
+    `projects + suffix` wherever the stored content hash still matches, so a
+    full sync keeps the keywords enrichment already computed. Returns the
+    number of projects carried over.
+    """
+    stored = {
+        row["id"]: (row["extracted_keywords_hash"], row["extracted_keywords"])
+        for row in db["projects"].find(
+            {"extracted_keywords_hash": {"$exists": True}},
+            {"_id": 0, "id": 1, "extracted_keywords": 1, "extracted_keywords_hash": 1})
+        if row.get("id")
+    }
+    if not stored:
+        return 0
+
+    carried = 0
+    batch = []
+    fields = {"id": 1, "title": 1, "objective": 1, "keywords": 1}
+    for row in db["projects" + suffix].find({"id": {"$in": list(stored)}}, fields):
+        content_hash, keywords = stored[row["id"]]
+        if keywords_content_hash(row) != content_hash:
+            continue
+        batch.append(UpdateOne({"_id": row["_id"]}, {"$set": {
+            "extracted_keywords": keywords, "extracted_keywords_hash": content_hash}}))
+        if len(batch) >= BATCH_SIZE:
+            carried += db["projects" + suffix].bulk_write(batch, ordered=False).modified_count
+            batch.clear()
+    if batch:
+        carried += db["projects" + suffix].bulk_write(batch, ordered=False).modified_count
+    return carried
+
+
+def validate_staging(db, loaded_counts):
+    """
+    Refuse to publish a staging generation whose row counts do not match
+    what was loaded, that is empty, or that lost most of the live rows.
+    """
+    errors = []
+    for name, loaded in loaded_counts.items():
+        staged = db[name + STAGING_SUFFIX].count_documents({})
+        if staged != loaded:
+            errors.append(f"{name}: loaded {loaded} rows but staging holds {staged}")
+        if name in REQUIRED_COLLECTIONS and staged == 0:
+            errors.append(f"{name}: staging is empty")
+
+        live = db[name].estimated_document_count()
+        if name in REQUIRED_COLLECTIONS and live and staged < live * MIN_RETAINED_FRACTION:
+            errors.append(f"{name}: staging has {staged} rows, live has {live}")
+
+    if errors:
+        raise RuntimeError("Staging validation failed: " + "; ".join(errors))
+
+
+def copy_collection(db, source, target):
+    """Replace `target` with a copy of `source` through a single $out."""
+    db[source].aggregate([{"$out": target}], allowDiskUse=True)
+
+
+def swap_generations(db):
+    """
+    Publish staging collections. The live generation is first copied to
+    *_previous, and indexed there, for rollback; each staging collection
+    then replaces its live collection with one renameCollection(dropTarget=True),
+    so a live collection never goes missing. The renames run back to back
+    once every copy is done, which keeps the moment readers can mix
+    generations down to the few milliseconds between them.
+
+    The copy is a deliberate trade-off: it costs the background sync job a
+    full $out per collection (later copies keep the indexes of the
+    *_previous they replace), but readers keep fixed collection names and
+    a rollback is only renames.
+    """
+    existing = set(db.list_collection_names())
+    names = [name for name in SWAP_COLLECTIONS if name + STAGING_SUFFIX in existing]
+    for name in names:
+        if name in existing:
+            copy_collection(db, name, name + PREVIOUS_SUFFIX)
+        else:
+            db[name + PREVIOUS_SUFFIX].drop()
+    ensure_indexes(db, [name for name in names if name in existing], PREVIOUS_SUFFIX)
+    for name in names:
+        db[name + STAGING_SUFFIX].rename(name, dropTarget=True)
+
+
+def has_previous_generation(db):
+    return "projects" + PREVIOUS_SUFFIX in db.list_collection_names()
+
+
+def deltas_since_previous(db):
+    """Delta syncs applied to live since *_previous was saved by a full sync."""
+    dataset = db["meta"].find_one({"_id": "dataset"}, {"deltasSincePrevious": 1}) or {}
+    return dataset.get("deltasSincePrevious", 0)
+
+
+def rollback_sync(db=None, force=False):
+    """
+    Put the previous generation back live. Each *_previous collection,
+    already indexed by swap_generations, replaces its live collection with
+    one renameCollection(dropTarget=True), so a rollback is a handful of
+    renames plus a metadata write. The rolled-back generation is dropped;
+    syncing its archive again brings it back. Runs as a sync job, under the
+    sync lock.
+
+    Delta syncs do not refresh *_previous, so after one the previous
+    generation predates every delta since the last full sync; that rollback
+    is refused unless `force`.
+    """
+    db = db if db is not None else get_database()
+
+    if not has_previous_generation(db):
+        raise RuntimeError("No previous generation to roll back to")
+    deltas = deltas_since_previous(db)
+    if deltas and not force:
+        raise RuntimeError(
+            f"{deltas} delta sync(s) ran since the previous generation was saved; "
+            f"rolling back would drop them")
+    existing = set(db.list_collection_names())
+
+    names = [name for name in SWAP_COLLECTIONS if name + PREVIOUS_SUFFIX in existing]
+    for name in names:
+        db[name + PREVIOUS_SUFFIX].rename(name, dropTarget=True)
+
+    # The live data no longer comes from the last synced archive, so the
+    # next sync of that archive must not be skipped as unchanged
+    db["meta"].update_one({"_id": "dataset"}, {"$unset": {
+        "archiveSha256": "", "schemaVersion": "", "deltasSincePrevious": ""}})
+    version = bump_dataset_version(db["meta"], rolledBackAt=datetime.utcnow())
+    print(f"↩️ Rolled back to previous generation (dataset version {version}).")
+    return {"status": "success", "dataset_version": version}
+
+
+def sync_full(db, zip_path, progress=no_progress):
+    """Load a CORDIS release into staging collections and swap them in."""
+    print("🗑 Dropping leftover staging collections...")
+    for name in SWAP_COLLECTIONS:
+        db[name + STAGING_SUFFIX].drop()
+
+    print("💾 Streaming new data into staging...")
+    loader = BulkLoader(progress=progress)
+    started = time.perf_counter()
+    results = loader.load({
+        db[name + STAGING_SUFFIX]: (iter_csv_from_zip(zip_path, prefix), key_fields)
+        for prefix, (name, key_fields) in SOURCES.items()
+    })
+    load_seconds = time.perf_counter() - started
+    loaded = {name[:-len(STAGING_SUFFIX)]: rows for name, (rows, _) in results.items()}
+
+    print("📈 Creating indexes on staging...")
+    progress("indexes")
+    ensure_indexes(db, SYNC_COLLECTIONS, STAGING_SUFFIX)
+
+    print("🌍 Writing project countries...")
+    progress("derived")
+    build_project_countries(db, STAGING_SUFFIX)
+
+    print("🏷 Carrying over extracted keywords...")
+    carried_keywords = carry_over_keywords(db, STAGING_SUFFIX)
+    print(f"✅ Kept extracted keywords of {carried_keywords} unchanged projects.")
+
+    print("📊 Building organization statistics...")
+    stats_count = build_organization_stats(db, STAGING_SUFFIX)
+    print(f"✅ Built statistics for {stats_count} organizations.")
+
+    print("🔑 Rebuilding keyword statistics...")
+    keyword_stats_count = rebuild_keyword_stats(db, STAGING_SUFFIX)
+    print(f"✅ Built {keyword_stats_count} keyword statistics.")
+
+    print("🔍 Validating staging...")
+    progress("validate")
+    validate_staging(db, loaded)
+
+    print("🔀 Swapping staging into live...")
+    progress("swap")
+    swap_generations(db)
 
-    print("✅ Sync completed.")
     return {
-        "projects_inserted": len(projects),
-        "organizations_inserted": len(organizations),
-        "status": "success"
+        "projects_inserted": loaded["projects"],
+        "organizations_inserted": loaded["organizations"],
+        "topics_inserted": loaded["topics"],
+        "organization_stats": stats_count,
+        "keyword_stats": keyword_stats_count,
+        "keywords_carried_over": carried_keywords,
+        "load_rows_per_second": round(sum(loaded.values()) / load_seconds) if load_seconds else 0,
+        "load_batches": loader.report()
     }
+
+
+def sync_cordis(mode="auto", source=None, force=False, db=None, progress=no_progress):
+    """
+    Main function to sync CORDIS data into MongoDB.
+
+    mode="full" reloads everything through staging collections, "delta"
+    applies only changed rows to the live collections, and "auto" uses a
+    delta whenever the live data carries row hashes from a previous sync.
+    `source` is the archive URL, a local path or a file:// URL; the sync is
+    skipped when its checksum matches the last synced archive unless `force`.
+    `progress(phase, **counters)` is called as the sync advances.
+    """
+    db = db if db is not None else get_database()
+
+    started = time.perf_counter()
+    source = source or os.getenv("CORDIS_SOURCE", CORDIS_ZIP_URL)
+    ensure_indexes(db, APP_COLLECTIONS)
+
+    print(f"⬇️ Fetching CORDIS archive from {source}...")
+    progress("fetch")
+    zip_path, archive_sha256, downloaded = fetch_archive(source, progress=progress)
+    fetch_seconds = round(time.perf_counter() - started, 1)
+
+    dataset = db["meta"].find_one({"_id": "dataset"}) or {}
+    if not force and dataset.get("archiveSha256") == archive_sha256 \
+            and dataset.get("schemaVersion") == SCHEMA_VERSION:
+        print("⏭️ CORDIS archive unchanged since the last sync, nothing to do.")
+        return {
+            "status": "unchanged",
+            "mode": "skipped",
+            "archive": {"sha256": archive_sha256, "downloaded": downloaded},
+            "dataset_version": dataset.get("version"),
+            "report": {"elapsed_seconds": round(time.perf_counter() - started, 1),
+                       "fetch_seconds": fetch_seconds,
+                       "peak_rss_mb": peak_rss_mb()}
+        }
+
+    if mode == "delta" or (mode == "auto" and has_row_hashes(db)):
+        print("🔁 Applying delta sync...")
+        result = sync_delta(db, zip_path, progress)
+        result["mode"] = "delta"
+        changed = any(counts[key] for counts in result["counts"].values()
+                      for key in ("inserted", "updated", "deleted"))
+    else:
+        result = sync_full(db, zip_path, progress)
+        result["mode"] = "full"
+        changed = True
+
+    progress("publish")
+    if changed:
+        version = bump_dataset_version(
+            db["meta"], archiveSha256=archive_sha256, schemaVersion=SCHEMA_VERSION)
+        if result["mode"] == "delta":
+            db["meta"].update_one({"_id": "dataset"}, {"$inc": {"deltasSincePrevious": 1}})
+        else:
+            db["meta"].update_one({"_id": "dataset"}, {"$set": {"deltasSincePrevious": 0}})
+    else:
+        db["meta"].update_one({"_id": "dataset"}, {"$set": {
+            "archiveSha256": archive_sha256, "schemaVersion": SCHEMA_VERSION
+        }}, upsert=True)
+        version = dataset.get("version")
+
+    result["archive"] = {"sha256": archive_sha256, "downloaded": downloaded}
+    result["report"] = {
+        "elapsed_seconds": round(time.perf_counter() - started, 1),
+        "fetch_seconds": fetch_seconds,
+        "peak_rss_mb": peak_rss_mb()
+    }
+    result["dataset_version"] = version
+    result["status"] = "success"
+
+    print(f"✅ Sync completed (dataset version {version}): "
+          f"{result['report']['elapsed_seconds']}s, peak RSS {result['report']['peak_rss_mb']} MB.")
+    return result
@@ -0,0 +1,281 @@
+"""
+Run CORDIS syncs as background jobs.
+
+The admin API queues a job and starts `python -m app.sync_jobs --job-id ID`
+in its own process; the job's phase, row counts, rate and errors are kept
+in the `sync_jobs` collection. A lease in the `locks` collection, extended
+by a heartbeat thread while the job runs, makes sure only one sync runs at
+a time.
+
+    python -m app.sync_jobs                      # run a sync in the foreground
+    python -m app.sync_jobs --mode full --force
+    python -m app.sync_jobs --mode rollback      # restore the previous generation
+"""
+import argparse
+import os
+import subprocess
+import sys
+import threading
+import time
+import traceback
+import uuid
+from datetime import datetime, timedelta
+
+from dotenv import load_dotenv
+from pymongo import DESCENDING
+from pymongo.errors import DuplicateKeyError
+
+from app.db import get_database
+from app.sync_cordis import rollback_sync, sync_cordis
+
+JOBS_COLLECTION = "sync_jobs"
+LOCKS_COLLECTION = "locks"
+SYNC_LOCK_ID = "sync"
+# A job whose process stops heartbeating loses the lock after this long
+LOCK_TTL_SECONDS = int(os.getenv("SYNC_LOCK_TTL", 600))
+HEARTBEAT_SECONDS = max(LOCK_TTL_SECONDS // 4, 1)
+# Minimum seconds between progress writes within one phase
+PROGRESS_INTERVAL = 2.0
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+ACTIVE_STATUSES = ("queued", "running")
+
+
+class SyncLockHeld(RuntimeError):
+    """Another sync job holds the lock."""
+
+    def __init__(self, job_id):
+        super().__init__(f"Sync job {job_id} is already running")
+        self.job_id = job_id
+
+
+def acquire_sync_lock(db, job_id):
+    """Take the sync lease for `job_id`, or raise SyncLockHeld."""
+    now = datetime.utcnow()
+    try:
+        # Matches only an expired lease; a live one makes the upsert collide on _id
+        db[LOCKS_COLLECTION].find_one_and_update(
+            {"_id": SYNC_LOCK_ID, "expiresAt": {"$lt": now}},
+            {"$set": {"jobId": job_id, "acquiredAt": now,
+                      "expiresAt": now + timedelta(seconds=LOCK_TTL_SECONDS)}},
+            upsert=True
+        )
+    except DuplicateKeyError:
+        holder = db[LOCKS_COLLECTION].find_one({"_id": SYNC_LOCK_ID}) or {}
+        raise SyncLockHeld(holder.get("jobId"))
+
+
+def renew_sync_lock(db, job_id):
+    result = db[LOCKS_COLLECTION].update_one(
+        {"_id": SYNC_LOCK_ID, "jobId": job_id},
+        {"$set": {"expiresAt": datetime.utcnow() + timedelta(seconds=LOCK_TTL_SECONDS)}}
+    )
+    if not result.matched_count:
+        print(f"⚠️ Sync job {job_id} no longer holds the sync lock.")
+
+
+def release_sync_lock(db, job_id):
+    db[LOCKS_COLLECTION].delete_one({"_id": SYNC_LOCK_ID, "jobId": job_id})
+
+
+class LockHeartbeat:
+    """
+    Renews the sync lease every HEARTBEAT_SECONDS from a daemon thread, so
+    phases that report progress rarely (index builds, derived stats, the
+    stale scan) keep the lock for as long as the job's process is alive.
+    """
+
+    def __init__(self, db, job_id):
+        self.db = db
+        self.job_id = job_id
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(
+            target=self._run, name=f"sync-lock-{job_id}", daemon=True)
+
+    def _run(self):
+        while not self._stopped.wait(HEARTBEAT_SECONDS):
+            try:
+                renew_sync_lock(self.db, self.job_id)
+                self.db[JOBS_COLLECTION].update_one(
+                    {"_id": self.job_id}, {"$set": {"heartbeatAt": datetime.utcnow()}})
+            except Exception as e:
+                # Keep beating; the next renewal may reach the server
+                print(f"⚠️ Could not renew the sync lock for job {self.job_id}: {e}")
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stopped.set()
+        self._thread.join()
+
+
+class JobProgress:
+    """
+    Progress callback for sync_cordis that records the phase, counters and
+    per-phase rate on the job document. Writes within a phase are throttled
+    to one every PROGRESS_INTERVAL seconds.
+    """
+
+    def __init__(self, db, job_id):
+        self.db = db
+        self.job_id = job_id
+        self.phase = None
+        self._phase_started = 0.0
+        self._reported_at = 0.0
+        self._lock = threading.Lock()
+
+    def __call__(self, phase, **counters):
+        now = time.monotonic()
+        with self._lock:
+            if phase == self.phase and now - self._reported_at < PROGRESS_INTERVAL:
+                return
+            if phase != self.phase:
+                self.phase = phase
+                self._phase_started = now
+            self._reported_at = now
+            elapsed = now - self._phase_started
+
+        update = {"phase": phase, "progress": counters, "updatedAt": datetime.utcnow()}
+        if "rows" in counters:
+            update["rows"] = counters["rows"]
+            update["rowsPerSecond"] = round(counters["rows"] / elapsed) if elapsed else None
+        self.db[JOBS_COLLECTION].update_one({"_id": self.job_id}, {"$set": update})
+
+
+def create_sync_job(db, mode="auto", source=None, force=False):
+    """Queue a sync job and take the lock for it; returns the job id."""
+    job_id = uuid.uuid4().hex
+    acquire_sync_lock(db, job_id)
+    db[JOBS_COLLECTION].insert_one({
+        "_id": job_id,
+        "status": "queued",
+        "phase": "queued",
+        "mode": mode,
+        "source": source,
+        "force": force,
+        "rows": 0,
+        "rowsPerSecond": None,
+        "errors": [],
+        "createdAt": datetime.utcnow(),
+        "updatedAt": datetime.utcnow()
+    })
+    return job_id
+
+
+def start_sync_job(db, mode="auto", source=None, force=False):
+    """Queue a sync job and run it in a separate process; returns the job id."""
+    job_id = create_sync_job(db, mode=mode, source=source, force=force)
+    try:
+        process = subprocess.Popen(
+            [sys.executable, "-m", "app.sync_jobs", "--job-id", job_id],
+            cwd=BACKEND_DIR,
+            start_new_session=True
+        )
+    except OSError as e:
+        fail_job(db, job_id, e)
+        release_sync_lock(db, job_id)
+        raise
+    db[JOBS_COLLECTION].update_one({"_id": job_id}, {"$set": {"pid": process.pid}})
+    # Reap the child when it exits so it does not linger as a zombie
+    threading.Thread(target=process.wait, name=f"sync-reaper-{job_id}", daemon=True).start()
+    return job_id
+
+
+def fail_job(db, job_id, error):
+    db[JOBS_COLLECTION].update_one({"_id": job_id}, {
+        "$set": {"status": "failed", "finishedAt": datetime.utcnow(),
+                 "updatedAt": datetime.utcnow()},
+        "$push": {"errors": {"message": str(error), "type": type(error).__name__,
+                             "traceback": traceback.format_exc()}}
+    })
+
+
+def run_sync_job(db, job_id):
+    """
+    Run a queued job to completion in this process, then release the lock.
+    Rollback jobs (mode "rollback") restore the previous generation.
+    """
+    job = db[JOBS_COLLECTION].find_one({"_id": job_id})
+    if job is None:
+        raise ValueError(f"Unknown sync job {job_id}")
+
+    db[JOBS_COLLECTION].update_one({"_id": job_id}, {"$set": {
+        "status": "running", "pid": os.getpid(),
+        "startedAt": datetime.utcnow(), "updatedAt": datetime.utcnow()
+    }})
+    try:
+        with LockHeartbeat(db, job_id):
+            if job.get("mode") == "rollback":
+                result = rollback_sync(db, force=job.get("force", False))
+            else:
+                result = sync_cordis(
+                    mode=job.get("mode", "auto"),
+                    source=job.get("source"),
+                    force=job.get("force", False),
+                    db=db,
+                    progress=JobProgress(db, job_id)
+                )
+        if "affected_project_ids" in result:
+            result["affected_project_ids"] = len(result["affected_project_ids"])
+        db[JOBS_COLLECTION].update_one({"_id": job_id}, {"$set": {
+            "status": result["status"], "phase": "done", "result": result,
+            "finishedAt": datetime.utcnow(), "updatedAt": datetime.utcnow()
+        }})
+        return result
+    except Exception as e:
+        print(f"❌ Sync job {job_id} failed: {e}")
+        fail_job(db, job_id, e)
+        raise
+    finally:
+        release_sync_lock(db, job_id)
+
+
+def get_sync_job(db, job_id):
+    """
+    The job document without error tracebacks, with jobs whose lease ran
+    out reported as abandoned.
+    """
+    job = db[JOBS_COLLECTION].find_one({"_id": job_id}, {"errors.traceback": 0})
+    if job and job["status"] in ACTIVE_STATUSES:
+        lock = db[LOCKS_COLLECTION].find_one({"_id": SYNC_LOCK_ID}) or {}
+        if lock.get("jobId") != job_id or lock["expiresAt"] < datetime.utcnow():
+            job["status"] = "abandoned"
+    return job
+
+
+def list_sync_jobs(db, limit=20):
+    return list(db[JOBS_COLLECTION].find({}, {"errors.traceback": 0})
+                .sort("createdAt", DESCENDING).limit(limit))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--job-id", help="run a job queued through the admin API")
+    parser.add_argument("--mode", choices=("auto", "full", "delta", "rollback"), default="auto")
+    parser.add_argument("--source", help="archive URL, local path or file:// URL")
+    parser.add_argument("--force", action="store_true",
+                        help="sync even if the archive is unchanged; roll back "
+                             "even if delta syncs ran since the last full sync")
+    args = parser.parse_args(argv)
+
+    load_dotenv()
+    db = get_database()
+
+    job_id = args.job_id
+    if job_id is None:
+        try:
+            job_id = create_sync_job(db, mode=args.mode, source=args.source, force=args.force)
+        except SyncLockHeld as e:
+            parser.exit(1, f"{e}\n")
+        print(f"Sync job {job_id}")
+
+    try:
+        run_sync_job(db, job_id)
+    except Exception:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
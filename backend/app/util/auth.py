@@ -0,0 +1,135 @@
+# app/util/auth.py
+from collections import OrderedDict
+import os
+import threading
+import time
+
+import jwt
+from jwt import PyJWKClient
+
+# Clerk session tokens are RS256; the clock skew allowance is in seconds
+ALGORITHMS = ["RS256"]
+LEEWAY_SECONDS = 5
+JWKS_REFRESH_SECONDS = int(os.getenv("CLERK_JWKS_REFRESH_SECONDS", 3600))
+# Unknown key ids refetch the JWKS at most this often
+JWKS_MIN_REFETCH_SECONDS = 30
+
+
+def _https(url):
+    url = url.strip().rstrip("/")
+    return url if url.startswith(("http://", "https://")) else f"https://{url}"
+
+
+class TokenVerifier:
+    """
+    Verifies Clerk session tokens locally. Signing keys come from the
+    instance's JWKS (CLERK_JWKS_URL, or CLERK_FRONTEND_API/.well-known/jwks.json),
+    cached for JWKS_REFRESH_SECONDS and refetched early only when a token
+    names a key id that is not in the cached set. CLERK_JWT_KEY, a PEM
+    public key, replaces the JWKS entirely so tests and offline setups
+    need no network.
+    """
+
+    def __init__(self, jwks_url=None, public_key=None, issuer=None, authorized_parties=None):
+        self.public_key = public_key
+        self.issuer = issuer
+        self.authorized_parties = authorized_parties or []
+        self._client = PyJWKClient(
+            jwks_url, cache_jwk_set=True, lifespan=JWKS_REFRESH_SECONDS, timeout=5) \
+            if jwks_url and not public_key else None
+        self._refetched_at = 0.0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls):
+        frontend_api = os.getenv("CLERK_FRONTEND_API")
+        jwks_url = os.getenv("CLERK_JWKS_URL") or (
+            f"{_https(frontend_api)}/.well-known/jwks.json" if frontend_api else None)
+        public_key = os.getenv("CLERK_JWT_KEY")
+        if public_key:
+            # Allow the PEM in a single-line env var
+            public_key = public_key.replace("\\n", "\n")
+        parties = [p.strip() for p in os.getenv("CLERK_AUTHORIZED_PARTIES", "").split(",") if p.strip()]
+        return cls(
+            jwks_url=jwks_url,
+            public_key=public_key,
+            issuer=_https(frontend_api) if frontend_api else None,
+            authorized_parties=parties
+        )
+
+    def _signing_key(self, token):
+        if self.public_key:
+            return self.public_key
+        if self._client is None:
+            raise jwt.InvalidKeyError("No CLERK_JWT_KEY or JWKS URL configured")
+
+        kid = jwt.get_unverified_header(token).get("kid")
+        keys = {key.key_id: key for key in self._client.get_signing_keys()}
+        if kid not in keys:
+            with self._lock:
+                if time.monotonic() - self._refetched_at >= JWKS_MIN_REFETCH_SECONDS:
+                    self._refetched_at = time.monotonic()
+                    keys = {key.key_id: key for key in self._client.get_signing_keys(refresh=True)}
+        if kid not in keys:
+            raise jwt.InvalidTokenError(f"Unknown signing key: {kid}")
+        return keys[kid].key
+
+    def verify(self, token):
+        """Return the claims of a valid token; raises jwt.PyJWTError otherwise."""
+        claims = jwt.decode(
+            token,
+            self._signing_key(token),
+            algorithms=ALGORITHMS,
+            issuer=self.issuer,
+            leeway=LEEWAY_SECONDS,
+            options={"require": ["exp", "sub"], "verify_aud": False}
+        )
+        if self.authorized_parties and claims.get("azp") not in self.authorized_parties:
+            raise jwt.InvalidTokenError("Token issued for an unauthorized party")
+        return claims
+
+
+class TTLCache:
+    """A small thread-safe LRU mapping whose entries expire after `ttl` seconds."""
+
+    def __init__(self, max_entries=1024, ttl=60):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._counters = {"hits": 0, "misses": 0}
+
+    def get(self, key):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < now:
+                self._entries.pop(key, None)
+                self._counters["misses"] += 1
+                return None
+            self._entries.move_to_end(key)
+            self._counters["hits"] += 1
+            return entry[1]
+
+    def put(self, key, value):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def stats(self):
+        with self._lock:
+            return dict(self._counters, entries=len(self._entries),
+                        max_entries=self.max_entries, ttl=self.ttl)
+
+
+# Clerk user id -> user document, per worker; UserModel writes invalidate it
+user_cache = TTLCache(
+    max_entries=int(os.getenv("USER_CACHE_SIZE", 1024)),
+    ttl=int(os.getenv("USER_CACHE_TTL", 30))
+)
@@ -0,0 +1,68 @@
+# app/util/autocomplete.py
+from bisect import bisect_left
+import heapq
+
+# Prefixes up to this length have their top suggestions precomputed, since
+# they match the largest ranges of the index
+PRECOMPUTED_PREFIX_LENGTH = 3
+MAX_SUGGESTIONS = 20
+
+
+class PrefixIndex:
+    """
+    Sorted-array prefix index over a weighted vocabulary. Each entry is
+    reachable from its full text and from the start of every word in it, so
+    "learn" suggests "machine learning". Lookups are two bisects plus a
+    top-k selection over the matching range.
+    """
+
+    def __init__(self, entries):
+        self.entries = []
+        self.counts = []
+        terms = []
+
+        for text, count in entries:
+            text = (text or "").strip().lower()
+            if not text:
+                continue
+            idx = len(self.entries)
+            self.entries.append(text)
+            self.counts.append(count)
+
+            words = text.split()
+            for i in range(len(words)):
+                terms.append((" ".join(words[i:]), idx))
+
+        terms.sort()
+        self._terms = [term for term, _ in terms]
+        self._targets = [idx for _, idx in terms]
+        self._top = self._precompute_top()
+
+    def __len__(self):
+        return len(self.entries)
+
+    def _rank(self, indices, limit):
+        return heapq.nlargest(limit, set(indices), key=lambda i: (self.counts[i], -i))
+
+    def _precompute_top(self):
+        groups = {}
+        for term, idx in zip(self._terms, self._targets):
+            for length in range(1, min(len(term), PRECOMPUTED_PREFIX_LENGTH) + 1):
+                groups.setdefault(term[:length], []).append(idx)
+        return {prefix: self._rank(indices, MAX_SUGGESTIONS)
+                for prefix, indices in groups.items()}
+
+    def suggest(self, prefix, limit=10):
+        """Return up to `limit` (text, count) pairs starting with `prefix`, most popular first."""
+        prefix = prefix.strip().lower()
+        if not prefix:
+            return []
+
+        if len(prefix) <= PRECOMPUTED_PREFIX_LENGTH and limit <= MAX_SUGGESTIONS:
+            ranked = self._top.get(prefix, [])[:limit]
+        else:
+            lo = bisect_left(self._terms, prefix)
+            hi = bisect_left(self._terms, prefix + "\uffff", lo)
+            ranked = self._rank(self._targets[lo:hi], limit)
+
+        return [(self.entries[i], self.counts[i]) for i in ranked]
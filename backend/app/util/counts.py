@@ -0,0 +1,62 @@
+# app/util/counts.py
+import json
+import os
+import sqlite3
+
+# Totals above this are reported as "1000+" unless an exact count is asked for
+COUNT_LIMIT = 1000
+# Stored counts kept per collection; every distinct query adds one, so the
+# oldest are dropped past this
+COUNT_CACHE_ENTRIES = int(os.getenv("COUNT_CACHE_ENTRIES", 5000))
+
+
+def cached_count(store, dataset_version, collection, query, exact=False, cap=COUNT_LIMIT):
+    """
+    Count `query` on `collection`, stopping after `cap + 1` matches unless
+    `exact`. Results are kept in the shared result store under the
+    canonical JSON of the query and the dataset version, so every worker
+    reuses them until the next sync or until COUNT_CACHE_ENTRIES newer
+    counts of the collection push them out. Returns (count, capped).
+    """
+    version = dataset_version.get()
+    limit = None if exact else cap + 1
+    key = store.make_key(f"count.{collection.name}", {"query": query, "limit": limit}, version)
+
+    def compute():
+        options = {"limit": limit} if limit else {}
+        return json.dumps(collection.count_documents(query, **options)).encode("utf-8")
+
+    try:
+        count = json.loads(store.get_or_compute(
+            key, version, compute, max_entries=COUNT_CACHE_ENTRIES))
+    except sqlite3.Error as e:
+        print(f"Result store unavailable for counts: {e}")
+        count = json.loads(compute())
+
+    if not exact and count > cap:
+        return cap, True
+    return count, False
+
+
+def page_total(count, capped, page, per_page, has_more):
+    """
+    `total` and `pages` for a response. A capped total is reported as
+    "1000+", and pages keep growing while the current page has a successor.
+    """
+    pages = (count + per_page - 1) // per_page
+    if capped:
+        pages = max(pages + 1, page + 1 if has_more else page)
+        return f"{count}+", pages
+    return count, pages
+
+
+def result_count(store, dataset_version, collection, query, found, page, per_page,
+                 cursor=None, exact=False):
+    """
+    (count, capped) for a page of `found` documents. An offset page that
+    comes back partial ends the result set, so its total follows from the
+    page and needs no count; everything else goes through cached_count.
+    """
+    if not cursor and (0 < found < per_page or (page == 1 and not found)):
+        return (page - 1) * per_page + found, False
+    return cached_count(store, dataset_version, collection, query, exact=exact)
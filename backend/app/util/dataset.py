@@ -0,0 +1,72 @@
+# app/util/dataset.py
+from datetime import datetime
+import threading
+import time
+import uuid
+
+DATASET_ID = "dataset"
+
+
+def bump_dataset_version(meta_collection, **extra):
+    """Record that the dataset changed; returns the new version string."""
+    version = f"{datetime.utcnow():%Y%m%d%H%M%S}-{uuid.uuid4().hex[:8]}"
+    meta_collection.update_one(
+        {"_id": DATASET_ID},
+        {"$set": dict(extra, version=version, updatedAt=datetime.utcnow())},
+        upsert=True
+    )
+    return version
+
+
+class DatasetVersion:
+    """
+    Current dataset version, re-read from the meta collection at most every
+    `ttl` seconds so hot paths do not pay a database call per request.
+    """
+
+    def __init__(self, meta_collection, ttl=30):
+        self.meta_collection = meta_collection
+        self.ttl = ttl
+        self._version = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    def get(self):
+        now = time.monotonic()
+        if now - self._checked_at < self.ttl:
+            return self._version
+
+        with self._lock:
+            if now - self._checked_at >= self.ttl:
+                doc = self.meta_collection.find_one({"_id": DATASET_ID}, {"version": 1})
+                self._version = doc.get("version") if doc else "initial"
+                self._checked_at = now
+        return self._version
+
+    def invalidate(self):
+        self._checked_at = 0.0
+
+
+class VersionedValue:
+    """An in-process value built from the database, rebuilt when the dataset version changes."""
+
+    def __init__(self, dataset_version, build):
+        self.dataset_version = dataset_version
+        self.build = build
+        self._value = None
+        self._version = None
+        self._lock = threading.Lock()
+
+    def get(self):
+        version = self.dataset_version.get()
+        if self._value is not None and self._version == version:
+            return self._value
+
+        with self._lock:
+            if self._value is None or self._version != version:
+                started = time.perf_counter()
+                self._value = self.build()
+                self._version = version
+                print(f"🔄 Rebuilt {getattr(self.build, '__name__', 'value')} for dataset "
+                      f"{version} in {time.perf_counter() - started:.3f}s")
+        return self._value
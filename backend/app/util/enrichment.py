@@ -0,0 +1,137 @@
+# app/util/enrichment.py
+from bson import ObjectId
+
+from app.util.schema import HIDE_SYNC_FIELDS
+
+
+def _serialize_org(org):
+    """Convert ObjectId to string for JSON."""
+    org = dict(org)
+    if isinstance(org.get("_id"), ObjectId):
+        org["_id"] = str(org["_id"])
+    return org
+
+
+def _is_coordinator(org):
+    return (org.get("role") or "").lower() == "coordinator"
+
+
+def fetch_participation_counts(organizations_collection, organisation_ids):
+    """
+    Return {organisationID: {"project_count", "coordinator_count"}} for the
+    given IDs using a single aggregation.
+    """
+    organisation_ids = list(organisation_ids)
+    if not organisation_ids:
+        return {}
+
+    pipeline = [
+        {"$match": {"organisationID": {"$in": organisation_ids}}},
+        {"$group": {
+            "_id": "$organisationID",
+            "project_count": {"$sum": 1},
+            "coordinator_count": {"$sum": {
+                "$cond": [
+                    {"$eq": [{"$toLower": {"$ifNull": ["$role", ""]}},
+                             "coordinator"]},
+                    1,
+                    0
+                ]
+            }}
+        }}
+    ]
+
+    return {
+        row["_id"]: {
+            "project_count": row["project_count"],
+            "coordinator_count": row["coordinator_count"]
+        }
+        for row in organizations_collection.aggregate(pipeline)
+    }
+
+
+def fetch_organization_stats(stats_collection, organisation_ids):
+    """
+    Return {organisationID: stats} from the materialized `organization_stats`
+    collection with a single `$in` lookup.
+    """
+    organisation_ids = list(organisation_ids)
+    if stats_collection is None or not organisation_ids:
+        return {}
+
+    return {
+        row["organisationID"]: row
+        for row in stats_collection.find(
+            {"organisationID": {"$in": organisation_ids}}, {"_id": 0})
+    }
+
+
+def resolve_participation_counts(organizations_collection, stats_collection, organisation_ids):
+    """
+    Read participation counts from `organization_stats`, falling back to a
+    live aggregation only for IDs the last sync did not materialize.
+    """
+    organisation_ids = set(organisation_ids)
+    counts = fetch_organization_stats(stats_collection, organisation_ids)
+
+    missing = organisation_ids - counts.keys()
+    if missing:
+        counts.update(fetch_participation_counts(
+            organizations_collection, missing))
+    return counts
+
+
+def enrich_projects_with_organizations(project_docs, organizations_collection, stats_collection=None):
+    """
+    Add coordinator and organizations to a page of project documents.
+
+    All partner rows are fetched with one `$in` query and the participation
+    counts of every distinct organisationID are read from `stats_collection`
+    in one more, so the number of round trips does not grow with the page size.
+    Returns new dicts in the same order as `project_docs`.
+    """
+    project_docs = list(project_docs)
+    project_ids = list({doc.get("id") for doc in project_docs if doc.get("id")})
+
+    orgs_by_project = {}
+    if project_ids:
+        for org in organizations_collection.find(
+                {"projectID": {"$in": project_ids}}, HIDE_SYNC_FIELDS):
+            orgs_by_project.setdefault(
+                org.get("projectID"), []).append(_serialize_org(org))
+
+    organisation_ids = {
+        org["organisationID"]
+        for orgs in orgs_by_project.values()
+        for org in orgs
+        if org.get("organisationID")
+    }
+    counts = resolve_participation_counts(
+        organizations_collection, stats_collection, organisation_ids)
+
+    enriched_projects = []
+    for doc in project_docs:
+        coordinator = None
+        organizations = []
+
+        for org in orgs_by_project.get(doc.get("id"), []):
+            # Copy so a project listed twice on a page gets independent rows
+            org_data = dict(org)
+            org_counts = counts.get(org_data.get("organisationID"), {})
+            org_data["project_count"] = org_counts.get("project_count", 0)
+            org_data["coordinator_count"] = org_counts.get(
+                "coordinator_count", 0)
+
+            # Every coordinator row stays out of `organizations`; the
+            # first one is reported as the coordinator
+            if _is_coordinator(org_data):
+                coordinator = coordinator or org_data
+            else:
+                organizations.append(org_data)
+
+        enriched = dict(doc)
+        enriched["coordinator"] = coordinator
+        enriched["organizations"] = organizations
+        enriched_projects.append(enriched)
+
+    return enriched_projects
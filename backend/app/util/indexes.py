@@ -0,0 +1,146 @@
+# app/util/indexes.py
+from pymongo import ASCENDING, DESCENDING, TEXT, IndexModel
+from pymongo.errors import OperationFailure
+
+# Indexes each collection needs for the queries the routes, the sync and
+# the enrichment actually run. Names are fixed so the report can compare
+# them with what the server has.
+INDEXES = {
+    "projects": [
+        IndexModel([("title", TEXT), ("acronym", TEXT),
+                    ("keywords", TEXT), ("objective", TEXT)],
+                   weights={"title": 10, "acronym": 8, "keywords": 5, "objective": 1},
+                   default_language="english", name="projects_text"),
+        IndexModel([("id", ASCENDING)], name="id_1"),
+        IndexModel([("status", ASCENDING)], name="status_1"),
+        IndexModel([("frameworkProgramme", ASCENDING)], name="frameworkProgramme_1"),
+        IndexModel([("topics", ASCENDING)], name="topics_1"),
+        IndexModel([("countries", ASCENDING)], name="countries_1"),
+        IndexModel([("startDate", ASCENDING)], name="startDate_1"),
+        IndexModel([("endDate", ASCENDING)], name="endDate_1"),
+        IndexModel([("ecMaxContribution", ASCENDING)], name="ecMaxContribution_1"),
+        IndexModel([("_rowKey", ASCENDING)], name="_rowKey_1"),
+    ],
+    "organizations": [
+        IndexModel([("name", TEXT), ("shortName", TEXT)],
+                   default_language="none", name="organizations_text"),
+        IndexModel([("projectID", ASCENDING)], name="projectID_1"),
+        IndexModel([("organisationID", ASCENDING), ("role", ASCENDING)],
+                   name="organisationID_1_role_1"),
+        IndexModel([("country", ASCENDING)], name="country_1"),
+        IndexModel([("_rowKey", ASCENDING)], name="_rowKey_1"),
+    ],
+    "topics": [
+        IndexModel([("topic", ASCENDING)], name="topic_1"),
+        IndexModel([("_rowKey", ASCENDING)], name="_rowKey_1"),
+    ],
+    "organization_stats": [
+        IndexModel([("organisationID", ASCENDING)], unique=True, name="organisationID_1"),
+    ],
+    "keyword_stats": [
+        IndexModel([("programme", ASCENDING), ("year", ASCENDING),
+                    ("status", ASCENDING), ("count", DESCENDING)],
+                   name="programme_1_year_1_status_1_count_-1"),
+        IndexModel([("keyword", ASCENDING), ("programme", ASCENDING),
+                    ("year", ASCENDING), ("status", ASCENDING)],
+                   unique=True, name="keyword_1_programme_1_year_1_status_1"),
+    ],
+    "users": [
+        IndexModel([("clerkUserId", ASCENDING)], unique=True, name="clerkUserId_1"),
+    ],
+    "sync_jobs": [
+        IndexModel([("createdAt", DESCENDING)], name="createdAt_-1"),
+    ],
+}
+
+# Collections the CORDIS sync loads and therefore indexes on staging
+SYNC_COLLECTIONS = ("projects", "organizations", "topics")
+# Collections the app writes itself; the sync job keeps their indexes too
+APP_COLLECTIONS = ("users", "sync_jobs")
+
+
+def _is_text(key):
+    return any(direction == TEXT for _, direction in key)
+
+
+def ensure_indexes(db, collections=None, suffix=""):
+    """
+    Create the declared indexes of `collections` (default: all) on
+    `name + suffix`. Existing matching indexes are left alone; a text index
+    under another name is replaced, since a collection can only have one.
+    Returns {collection: [created or conflicting index names]}.
+    """
+    applied = {}
+    for name in collections or INDEXES:
+        collection = db[name + suffix]
+        models = INDEXES[name]
+        existing = collection.index_information()
+
+        wanted_text = {m.document["name"] for m in models if _is_text(m.document["key"].items())}
+        for index_name, info in existing.items():
+            if wanted_text and _is_text(info["key"]) and index_name not in wanted_text:
+                collection.drop_index(index_name)
+                del existing[index_name]
+                break
+
+        missing = [m for m in models if m.document["name"] not in existing]
+        created = []
+        for model in missing:
+            try:
+                collection.create_indexes([model])
+                created.append(model.document["name"])
+            except OperationFailure as e:
+                # Same keys under another name or with other options
+                print(f"⚠️ Index {name}.{model.document['name']} not created: {e}")
+        if missing:
+            applied[name] = created
+    return applied
+
+
+def _is_prefix(shorter, longer):
+    return len(shorter) < len(longer) and longer[:len(shorter)] == shorter
+
+
+def index_report(db):
+    """
+    Compare declared and existing indexes per collection. Reports indexes
+    that are missing, present but undeclared, unused since the server
+    started (from $indexStats) and redundant because another index starts
+    with the same keys.
+    """
+    report = {}
+    existing_collections = set(db.list_collection_names())
+    for name, models in INDEXES.items():
+        declared = {m.document["name"] for m in models}
+        if name not in existing_collections:
+            report[name] = {"missing": sorted(declared), "exists": False}
+            continue
+
+        collection = db[name]
+        existing = collection.index_information()
+        usage = {
+            row["name"]: {"ops": row["accesses"]["ops"], "since": row["accesses"]["since"]}
+            for row in collection.aggregate([{"$indexStats": {}}])
+        }
+
+        keys = {
+            index_name: list(info["key"])
+            for index_name, info in existing.items()
+            if not _is_text(info["key"])
+        }
+        redundant = sorted(
+            index_name for index_name, key in keys.items()
+            if index_name != "_id_" and not existing[index_name].get("unique")
+            and any(_is_prefix(key, other) for other in keys.values())
+        )
+
+        report[name] = {
+            "exists": True,
+            "missing": sorted(declared - set(existing)),
+            "undeclared": sorted(set(existing) - declared - {"_id_"}),
+            "unused": sorted(index_name for index_name, stats in usage.items()
+                             if index_name != "_id_" and stats["ops"] == 0),
+            "redundant": redundant,
+            "usage": usage
+        }
+    return report
@@ -0,0 +1,155 @@
+# app/util/keyword_stats.py
+from collections import Counter
+from datetime import datetime
+from itertools import product
+
+from pymongo import DESCENDING, UpdateOne
+
+from app.util.indexes import ensure_indexes
+from app.util.nlp import field_keywords
+
+# Slice value meaning "any programme / year / status"
+ANY = "*"
+SLICE_FIELDS = ("programme", "year", "status")
+
+# Matches the delimiters field_keywords splits on
+_KEYWORD_REGEX = "[^,;|\\n]+"
+
+
+def project_year(project):
+    start = project.get("startDate")
+    if isinstance(start, datetime):
+        return start.year
+    try:
+        return int(str(start)[:4])
+    except (TypeError, ValueError):
+        return None
+
+
+def project_slice(project):
+    return (project.get("frameworkProgramme"), project_year(project), project.get("status"))
+
+
+def stats_keywords(project):
+    """Keywords a project contributes: stored extracted keywords, else its keywords field."""
+    if isinstance(project.get("extracted_keywords"), list):
+        return set(project["extracted_keywords"])
+    return field_keywords(project)
+
+
+def rollup_slices(project_slice_values):
+    """Every combination of the slice with dimensions replaced by ANY."""
+    return list(product(*((value, ANY) for value in project_slice_values)))
+
+
+def rebuild_keyword_stats(db, suffix=""):
+    """
+    Rebuild `keyword_stats` from the whole corpus. Each project counts once
+    per keyword in its own slice and in every rollup of that slice, so any
+    programme/year/status filter is a single indexed top-k read.
+    """
+    split_keywords = {
+        "$map": {
+            "input": {"$regexFindAll": {
+                "input": {"$cond": [{"$eq": [{"$type": "$keywords"}, "string"]},
+                                    "$keywords", ""]},
+                "regex": _KEYWORD_REGEX
+            }},
+            "in": {"$toLower": {"$trim": {"input": "$$this.match"}}}
+        }
+    }
+    year = {
+        "$cond": [
+            {"$eq": [{"$type": "$startDate"}, "date"]},
+            {"$year": "$startDate"},
+            {"$convert": {
+                "input": {"$substrCP": [{"$ifNull": ["$startDate", ""]}, 0, 4]},
+                "to": "int",
+                "onError": None,
+                "onNull": None
+            }}
+        ]
+    }
+    slices = [
+        {"programme": programme, "year": y, "status": status}
+        for programme, y, status in rollup_slices(
+            ("$frameworkProgramme", year, "$status"))
+    ]
+
+    pipeline = [
+        {"$project": {
+            "_id": 0,
+            "kw": {"$setUnion": [{"$cond": [
+                {"$isArray": "$extracted_keywords"},
+                "$extracted_keywords",
+                {"$filter": {"input": split_keywords,
+                             "cond": {"$gt": [{"$strLenCP": "$$this"}, 2]}}}
+            ]}]},
+            "slices": slices
+        }},
+        {"$unwind": "$kw"},
+        {"$unwind": "$slices"},
+        {"$group": {
+            "_id": {
+                "keyword": "$kw",
+                "programme": "$slices.programme",
+                "year": "$slices.year",
+                "status": "$slices.status"
+            },
+            "count": {"$sum": 1}
+        }},
+        {"$project": {
+            "_id": 0,
+            "keyword": "$_id.keyword",
+            "programme": "$_id.programme",
+            "year": "$_id.year",
+            "status": "$_id.status",
+            "count": 1
+        }},
+        {"$out": "keyword_stats" + suffix}
+    ]
+
+    db["projects" + suffix].aggregate(pipeline, allowDiskUse=True)
+    ensure_indexes(db, ["keyword_stats"], suffix)
+    return db["keyword_stats" + suffix].estimated_document_count()
+
+
+def apply_keyword_stats_delta(collection, changes):
+    """
+    Incrementally update `keyword_stats` for changed projects.
+    `changes` is an iterable of (old_project, new_project) pairs, either of
+    which may be None for an inserted or deleted project.
+    """
+    deltas = Counter()
+    for old, new in changes:
+        for project, sign in ((old, -1), (new, 1)):
+            if not project:
+                continue
+            for cell in rollup_slices(project_slice(project)):
+                for keyword in stats_keywords(project):
+                    deltas[(keyword,) + cell] += sign
+
+    updates = [
+        UpdateOne(dict(zip(("keyword",) + SLICE_FIELDS, key)),
+                  {"$inc": {"count": delta}}, upsert=True)
+        for key, delta in deltas.items() if delta
+    ]
+    if updates:
+        collection.bulk_write(updates, ordered=False)
+        collection.delete_many({
+            "keyword": {"$in": list({key[0] for key in deltas})},
+            "count": {"$lte": 0}
+        })
+    return len(updates)
+
+
+def top_keywords(collection, programme=None, year=None, status=None, limit=50):
+    """Most frequent keywords in a slice; unset dimensions mean any value."""
+    query = {
+        "programme": programme or ANY,
+        "year": year if year is not None else ANY,
+        "status": status or ANY
+    }
+    cursor = collection.find(query, {"_id": 0, "keyword": 1, "count": 1}) \
+        .sort("count", DESCENDING).limit(limit)
+    return [{"keyword": row["keyword"], "count": row["count"]} for row in cursor]
@@ -0,0 +1,261 @@
+# app/util/nlp.py
+import hashlib
+import re
+import threading
+import time
+
+MODEL_NAME = "en_core_web_sm"
+
+# Pipeline subsets per use case. Keywords need the tagger and parser for
+# noun chunks plus NER; summaries only need sentence boundaries (the much
+# cheaper senter instead of the parser) and NER for the entity bonus.
+# `exclude` drops components at load; `enable` turns on components the
+# model package ships disabled, as en_core_web_sm does with senter.
+PIPELINES = {
+    "keywords": {
+        "exclude": ["lemmatizer", "senter"],
+        "enable": []
+    },
+    "summary": {
+        "exclude": ["lemmatizer", "tagger", "attribute_ruler", "parser"],
+        "enable": ["senter"]
+    }
+}
+
+# Bump when summarize_objective changes so cached summaries are recomputed
+SUMMARIZER_VERSION = "1"
+
+# Bump when extract_project_keywords changes so stored keywords are recomputed
+KEYWORDS_VERSION = "1"
+
+
+def keywords_content_hash(project):
+    """Hash of everything extract_project_keywords reads from a project."""
+    keywords = project.get("keywords")
+    if isinstance(keywords, list):
+        keywords = "\n".join(str(k) for k in keywords)
+
+    payload = "\x1f".join([
+        KEYWORDS_VERSION,
+        str(keywords or ""),
+        project.get("title") or "",
+        (project.get("objective") or "")[:500]
+    ])
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+
+_models = {}
+_load_times = {}
+_lock = threading.Lock()
+
+
+def _load(purpose):
+    try:
+        import spacy
+    except ImportError:
+        return None
+
+    options = PIPELINES[purpose]
+    try:
+        nlp = spacy.load(MODEL_NAME, exclude=options["exclude"])
+    except OSError:
+        print(f"❌ spaCy model {MODEL_NAME} not found.")
+        return None
+
+    for name in options["enable"]:
+        if name in nlp.disabled:
+            nlp.enable_pipe(name)
+        elif name not in nlp.pipe_names:
+            # Model packages without a trained senter get the rule-based
+            # sentencizer rather than the full parser
+            print(f"⚠️ spaCy model {MODEL_NAME} has no {name}; "
+                  f"using the rule-based sentencizer for the {purpose} pipeline.")
+            nlp.add_pipe("sentencizer", first=True)
+    return nlp
+
+
+def get_nlp(purpose):
+    """
+    Return the spaCy pipeline for `purpose` ("keywords" or "summary"),
+    loading it on first use. Returns None when spaCy or the model is missing.
+    """
+    if purpose in _models:
+        return _models[purpose]
+
+    with _lock:
+        if purpose not in _models:
+            started = time.perf_counter()
+            _models[purpose] = _load(purpose)
+            _load_times[purpose] = round(time.perf_counter() - started, 3)
+            if _models[purpose] is not None:
+                print(f"✅ spaCy {purpose} pipeline loaded in {_load_times[purpose]}s: "
+                      f"{', '.join(_models[purpose].pipe_names)}")
+    return _models[purpose]
+
+
+def nlp_available(purpose):
+    return get_nlp(purpose) is not None
+
+
+def nlp_report():
+    """Loaded pipelines, their components and load times in seconds."""
+    return {
+        purpose: {
+            "loaded": model is not None,
+            "components": model.pipe_names if model is not None else [],
+            "load_seconds": _load_times.get(purpose)
+        }
+        for purpose, model in _models.items()
+    }
+
+
+def field_keywords(project):
+    """Normalize the keywords CORDIS ships in the project's `keywords` field."""
+    keywords = set()
+
+    # 1. Use existing keywords field (most important)
+    if project.get("keywords"):
+        project_keywords = project["keywords"]
+        if isinstance(project_keywords, str):
+            # Split by common delimiters
+            raw_keywords = re.split(r'[,;|\n]+', project_keywords)
+            for keyword in raw_keywords:
+                cleaned = keyword.strip().lower()
+                if len(cleaned) > 2:  # Filter out very short words
+                    keywords.add(cleaned)
+        elif isinstance(project_keywords, list):
+            for keyword in project_keywords:
+                if isinstance(keyword, str):
+                    cleaned = keyword.strip().lower()
+                    if len(cleaned) > 2:
+                        keywords.add(cleaned)
+
+    return keywords
+
+
+def keyword_text(project):
+    """Text the keyword pipeline runs on: title plus the start of the objective."""
+    text_content = ""
+    if project.get("title"):
+        text_content += project["title"] + " "
+    if project.get("objective"):
+        # Take first 500 chars to avoid processing very long texts
+        text_content += project["objective"][:500]
+    return text_content
+
+
+def keywords_from_doc(doc):
+    """Extract meaningful entities and noun phrases from a parsed keyword text."""
+    keywords = set()
+
+    for ent in doc.ents:
+        if ent.label_ in ["PRODUCT", "TECHNOLOGY", "ORG", "EVENT", "WORK_OF_ART"]:
+            cleaned = ent.text.lower().strip()
+            if len(cleaned) > 2:
+                keywords.add(cleaned)
+
+    # Extract key noun phrases (2-4 words)
+    for chunk in doc.noun_chunks:
+        if 2 <= len(chunk.text.split()) <= 4:
+            cleaned = chunk.text.lower().strip()
+            if len(cleaned) > 5:  # Longer phrases only
+                keywords.add(cleaned)
+
+    return keywords
+
+
+def extract_project_keywords(project):
+    """Extract and normalize keywords from project's keyword field and text content."""
+    keywords = field_keywords(project)
+
+    # 2. Extract from title and objective using NLP (if available)
+    nlp = get_nlp("keywords")
+    if nlp:
+        text_content = keyword_text(project)
+        if text_content:
+            try:
+                keywords |= keywords_from_doc(nlp(text_content))
+            except Exception as e:
+                print(f"Error in NLP keyword extraction: {e}")
+
+    return list(keywords)
+
+
+def summarize_objective(objective_text, max_sentences=3):
+    """Enhanced summarization using both NLP and project-specific keywords."""
+    if not objective_text:
+        return None
+    nlp = get_nlp("summary")
+    if not nlp:
+        return None
+
+    try:
+        return summarize_doc(objective_text, nlp(objective_text), max_sentences)
+    except Exception as e:
+        print(f"Error in enhanced summarization: {str(e)}")
+        return None
+
+
+def summarize_doc(objective_text, doc, max_sentences=3):
+    """Pick the top-scoring sentences of a parsed objective."""
+    sentences = list(doc.sents)
+
+    if len(sentences) <= max_sentences:
+        return objective_text
+
+    # Enhanced keywords specific to EU research projects
+    eu_keywords = [
+        # Core objectives
+        "aims", "objective", "goal", "purpose", "mission", "vision",
+        # Actions
+        "develop", "create", "improve", "enhance", "support", "promote",
+        "address", "focus", "target", "seek", "investigate", "explore",
+        "implement", "establish", "facilitate", "deliver", "provide",
+        # EU-specific terms
+        "innovation", "research", "technology", "sustainability", "digital",
+        "climate", "environment", "health", "security", "mobility",
+        "energy", "agriculture", "education", "society", "economy",
+        # Impact words
+        "impact", "benefit", "solution", "challenge", "opportunity",
+        "transformation", "advancement", "breakthrough", "excellence"
+    ]
+
+    scored = []
+    for i, sent in enumerate(sentences):
+        score = 0
+        sent_text = sent.text.lower()
+
+        # Keyword matching
+        score += sum(2 if word in sent_text else 0 for word in eu_keywords)
+
+        # Position bonus (first sentences often contain main objectives)
+        if i == 0:
+            score += 5
+        elif i == 1:
+            score += 3
+
+        # Length penalty for very short or very long sentences
+        word_count = len(sent.text.split())
+        if 10 <= word_count <= 30:
+            score += 1
+
+        # Entity bonus (using spaCy NER)
+        entities = [ent.label_ for ent in sent.ents]
+        if any(label in entities for label in ["PRODUCT", "TECHNOLOGY", "ORG"]):
+            score += 2
+
+        scored.append((score, sent.text.strip()))
+
+    # Sort by score and take top sentences
+    scored.sort(key=lambda x: x[0], reverse=True)
+    top_sentences = [s for _, s in scored[:max_sentences]]
+
+    # Maintain original order for readability
+    original_order = []
+    for sent in sentences:
+        if sent.text.strip() in top_sentences:
+            original_order.append(sent.text.strip())
+            if len(original_order) == max_sentences:
+                break
+
+    return " ".join(original_order)
@@ -0,0 +1,56 @@
+# app/util/pagination.py
+import base64
+import binascii
+import json
+
+from bson import ObjectId
+from bson.errors import InvalidId
+from pymongo import ASCENDING
+
+MAX_PAGE_SIZE = 100
+
+
+class InvalidCursor(ValueError):
+    """A cursor token that was not issued by keyset_find."""
+
+
+def page_size(value, default):
+    """The requested page size, capped to 1..MAX_PAGE_SIZE."""
+    try:
+        size = int(value)
+    except (TypeError, ValueError):
+        size = default
+    return min(max(size, 1), MAX_PAGE_SIZE)
+
+
+def encode_cursor(last_id):
+    raw = json.dumps({"after": str(last_id)}).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(token):
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        return ObjectId(json.loads(raw)["after"])
+    except (binascii.Error, ValueError, KeyError, TypeError, InvalidId) as e:
+        raise InvalidCursor("Invalid cursor") from e
+
+
+def keyset_find(collection, query, limit, cursor=None, page=1, projection=None):
+    """
+    One page of `query` in `_id` order. With a cursor token the page starts
+    right after the cursor's `_id`, so the server seeks on the `_id` index
+    instead of skipping earlier pages; without one, `page` falls back to
+    skip for page-number clients. Returns (docs, next cursor or None).
+    """
+    if cursor:
+        after = {"_id": {"$gt": decode_cursor(cursor)}}
+        query = {"$and": [query, after]} if query else after
+        skip = 0
+    else:
+        skip = (max(page, 1) - 1) * limit
+
+    docs = list(collection.find(query, projection)
+                .sort("_id", ASCENDING).skip(skip).limit(limit + 1))
+    next_cursor = encode_cursor(docs[limit - 1]["_id"]) if len(docs) > limit else None
+    return docs[:limit], next_cursor
@@ -0,0 +1,172 @@
+# app/util/project_details.py
+from bson import ObjectId
+from pymongo.errors import PyMongoError
+
+from app.db import db
+from app.util.enrichment import enrich_projects_with_organizations as enrich_organizations_batch
+from app.util.keyword_stats import apply_keyword_stats_delta
+from app.util.nlp import (
+    SUMMARIZER_VERSION,
+    extract_project_keywords,
+    keywords_content_hash,
+    nlp_available,
+    summarize_objective,
+)
+from app.util.schema import HIDE_SYNC_FIELDS
+from app.util.summary_cache import SummaryCache
+
+# Optional detail sections of a project response
+PROJECT_SECTIONS = ("organizations", "keywords", "summary")
+MAX_BATCH_IDS = 100
+
+projects_collection = db["projects"]
+organizations_collection = db["organizations"]
+organization_stats_collection = db["organization_stats"]
+keyword_stats_collection = db["keyword_stats"]
+summary_cache = SummaryCache(db["summaries"], SUMMARIZER_VERSION)
+
+
+def convert_objectid(doc):
+    """Convert all ObjectId fields in a document to strings."""
+    for k, v in doc.items():
+        if isinstance(v, ObjectId):
+            doc[k] = str(v)
+    return doc
+
+
+def get_projects_keywords(projects):
+    """
+    Return the stored `extracted_keywords` of each project. Projects with a
+    missing field or a stale content hash are recomputed and written back.
+    Each write only matches the content hash that was read, and keyword_stats
+    is only adjusted for writes that matched, so concurrent requests
+    recomputing the same project count it once.
+    """
+    results = []
+    stale = []
+
+    for project in projects:
+        content_hash = keywords_content_hash(project)
+        stored = project.get("extracted_keywords")
+        if project.get("extracted_keywords_hash") == content_hash and isinstance(stored, list):
+            results.append(stored)
+            continue
+
+        keywords = extract_project_keywords(project)
+        results.append(keywords)
+
+        # Without the NLP model the result is partial, so don't persist it
+        if nlp_available("keywords") and project.get("id"):
+            stale.append((project, keywords, content_hash))
+
+    changes = []
+    try:
+        for project, keywords, content_hash in stale:
+            result = projects_collection.update_one(
+                {"id": project["id"],
+                 "extracted_keywords_hash": project.get("extracted_keywords_hash")},
+                {"$set": {
+                    "extracted_keywords": keywords,
+                    "extracted_keywords_hash": content_hash
+                }}
+            )
+            if result.modified_count:
+                changes.append((project, dict(project, extracted_keywords=keywords)))
+        if changes:
+            apply_keyword_stats_delta(keyword_stats_collection, changes)
+    except PyMongoError as e:
+        print(f"Error storing extracted keywords: {e}")
+
+    return results
+
+
+def get_project_keywords(project):
+    """Return the stored keywords of a single project, recomputing them if stale."""
+    return get_projects_keywords([project])[0]
+
+
+def enrich_projects_with_organizations(project_docs):
+    """Add organization data to a page of project documents in a fixed number of queries."""
+    return enrich_organizations_batch(
+        project_docs, organizations_collection, organization_stats_collection)
+
+
+def objective_data(objective, summary):
+    """The objective with its summary, as returned on project details."""
+    if not objective:
+        return {
+            "full_text": None,
+            "summary": None,
+            "has_summary": False,
+            "original_length": 0,
+            "summary_length": 0,
+            "compression_ratio": 0
+        }
+    return {
+        "full_text": objective,
+        "summary": summary,
+        "has_summary": summary is not None,
+        "original_length": len(objective),
+        "summary_length": len(summary) if summary else 0,
+        "compression_ratio": round(len(summary) / len(objective) * 100, 1) if summary else 0
+    }
+
+
+def parse_id_list(value):
+    """Comma-separated ids, deduplicated in their original order."""
+    return list(dict.fromkeys(i.strip() for i in value.split(",") if i.strip()))
+
+
+def parse_sections(fields):
+    """Detail sections named in `fields`; all of them when it is not given."""
+    if fields is None:
+        return PROJECT_SECTIONS
+    sections = tuple(f.strip() for f in fields.split(",") if f.strip())
+    unknown = set(sections) - set(PROJECT_SECTIONS)
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(sorted(unknown))}; "
+                         f"expected any of {', '.join(PROJECT_SECTIONS)}")
+    return sections
+
+
+def expand_projects(docs, sections=PROJECT_SECTIONS):
+    """
+    Add the requested detail sections to project documents: organizations
+    through one batched enrichment, keywords through one bulk lookup and
+    objective summaries through one summary cache read.
+    """
+    docs = [convert_objectid(doc) for doc in docs]
+    if "organizations" in sections:
+        expanded = enrich_projects_with_organizations(docs)
+    else:
+        expanded = [dict(doc) for doc in docs]
+
+    if "keywords" in sections:
+        for doc, keywords in zip(expanded, get_projects_keywords(docs)):
+            doc["extracted_keywords"] = keywords
+
+    if "summary" in sections:
+        objectives = [doc.get("objective") for doc in docs]
+        summaries = iter(summary_cache.get_many(
+            [objective for objective in objectives if objective], summarize_objective))
+        for doc, objective in zip(expanded, objectives):
+            doc["objective_data"] = objective_data(
+                objective, next(summaries) if objective else None)
+
+    for doc in expanded:
+        doc.pop("extracted_keywords_hash", None)
+    return expanded
+
+
+def fetch_projects(ids, sections=PROJECT_SECTIONS):
+    """
+    Projects with the given ids in the requested order, read with a single
+    `$in` query. Returns (projects, ids that were not found).
+    """
+    by_id = {}
+    for doc in projects_collection.find({"id": {"$in": ids}}, HIDE_SYNC_FIELDS):
+        by_id.setdefault(doc["id"], doc)
+
+    found = [by_id[project_id] for project_id in ids if project_id in by_id]
+    missing = [project_id for project_id in ids if project_id not in by_id]
+    return expand_projects(found, sections), missing
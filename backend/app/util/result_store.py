@@ -0,0 +1,202 @@
+# app/util/result_store.py
+from functools import wraps
+import hashlib
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+import uuid
+
+from flask import Response, request
+
+DEFAULT_PATH = os.path.join(tempfile.gettempdir(), "nexora-results.sqlite3")
+
+
+class ResultStore:
+    """
+    Precomputed endpoint payloads shared by every worker on this host,
+    stored in a local SQLite file. Entries are keyed by endpoint, normalized
+    parameters and dataset version. A lease row per key makes sure only one
+    worker computes a missing entry while the others wait for it.
+    """
+
+    def __init__(self, path=DEFAULT_PATH, lease_seconds=120, wait_seconds=60):
+        self.path = path
+        self.lease_seconds = lease_seconds
+        self.wait_seconds = wait_seconds
+        self._token = uuid.uuid4().hex
+        self._local = threading.local()
+        self._counters = {"hits": 0, "misses": 0, "waits": 0}
+
+    @property
+    def owner(self):
+        # Unique per worker process and thread, also across forks
+        return f"{self._token}:{os.getpid()}:{threading.get_ident()}"
+
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None or getattr(self._local, "pid", None) != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS results ("
+                " key TEXT PRIMARY KEY, version TEXT, payload BLOB, created_at REAL)")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS leases ("
+                " key TEXT PRIMARY KEY, owner TEXT, expires_at REAL)")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS versions ("
+                " version TEXT PRIMARY KEY, first_seen REAL)")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    @staticmethod
+    def make_key(endpoint, params, version):
+        normalized = json.dumps(params, sort_keys=True, default=str)
+        digest = hashlib.sha1(normalized.encode("utf-8")).hexdigest()
+        return f"{endpoint}:{version}:{digest}"
+
+    def get(self, key):
+        row = self._conn().execute(
+            "SELECT payload FROM results WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def put(self, key, version, payload):
+        conn = self._conn()
+        now = time.time()
+        conn.execute(
+            "INSERT OR IGNORE INTO versions (version, first_seen) VALUES (?, ?)", (version, now))
+        conn.execute(
+            "INSERT OR REPLACE INTO results (key, version, payload, created_at)"
+            " VALUES (?, ?, ?, ?)", (key, version, payload, now))
+
+    def _acquire(self, key):
+        conn = self._conn()
+        now = time.time()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute(
+                "SELECT owner, expires_at FROM leases WHERE key = ?", (key,)).fetchone()
+            if row and row[0] != self.owner and row[1] > now:
+                conn.execute("COMMIT")
+                return False
+            conn.execute(
+                "INSERT OR REPLACE INTO leases (key, owner, expires_at) VALUES (?, ?, ?)",
+                (key, self.owner, now + self.lease_seconds))
+            conn.execute("COMMIT")
+            return True
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def _release(self, key):
+        self._conn().execute(
+            "DELETE FROM leases WHERE key = ? AND owner = ?", (key, self.owner))
+
+    def get_or_compute(self, key, version, compute, max_entries=None):
+        """
+        Return the stored payload for `key`, or compute it. `compute()` must
+        return bytes, or None for a result that should not be stored. With
+        `max_entries`, the endpoint keeps at most that many entries.
+        """
+        payload = self.get(key)
+        if payload is not None:
+            self._counters["hits"] += 1
+            return payload
+
+        deadline = time.monotonic() + self.wait_seconds
+        while not self._acquire(key):
+            # Another worker is computing this entry
+            self._counters["waits"] += 1
+            time.sleep(0.05)
+            payload = self.get(key)
+            if payload is not None:
+                self._counters["hits"] += 1
+                return payload
+            if time.monotonic() > deadline:
+                break
+
+        try:
+            # The previous lease holder may have finished just before we got in
+            payload = self.get(key)
+            if payload is not None:
+                self._counters["hits"] += 1
+                return payload
+
+            self._counters["misses"] += 1
+            payload = compute()
+            if payload is not None:
+                self.put(key, version, payload)
+                self.prune(version, key.split(":", 1)[0], max_entries)
+            return payload
+        finally:
+            self._release(key)
+
+    def prune(self, version, endpoint, max_entries=None):
+        """
+        Drop entries of `endpoint` from dataset versions first seen before
+        `version` and, past `max_entries`, its oldest entries. Workers cache
+        the dataset version for a while after a sync, so one still on the
+        old version must not prune the new version's entries.
+        """
+        conn = self._conn()
+        conn.execute(
+            "DELETE FROM results WHERE key LIKE ? AND version IN ("
+            " SELECT version FROM versions WHERE first_seen <"
+            " (SELECT first_seen FROM versions WHERE version = ?))",
+            (f"{endpoint}:%", version))
+        if max_entries:
+            conn.execute(
+                "DELETE FROM results WHERE key IN (SELECT key FROM results WHERE key LIKE ?"
+                " ORDER BY created_at DESC LIMIT -1 OFFSET ?)",
+                (f"{endpoint}:%", max_entries))
+
+    def stats(self):
+        row = self._conn().execute(
+            "SELECT COUNT(*), COALESCE(SUM(LENGTH(payload)), 0) FROM results").fetchone()
+        return dict(self._counters, entries=row[0], bytes=row[1], path=self.path)
+
+
+result_store = ResultStore(os.getenv("RESULT_STORE_PATH", DEFAULT_PATH))
+
+
+def shared_result(store, dataset_version, endpoint=None):
+    """
+    Serve a JSON view from `store`. Only 200 responses are stored; the key
+    covers the endpoint, the sorted query string and the dataset version.
+    """
+    def decorator(view):
+        name = endpoint or view.__name__
+
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            version = dataset_version.get()
+            params = {"args": sorted(request.args.items(multi=True)), "view_args": kwargs}
+            key = store.make_key(name, params, version)
+
+            failure = {}
+
+            def compute():
+                response = view(*args, **kwargs)
+                if isinstance(response, tuple) or response.status_code != 200:
+                    failure["response"] = response
+                    return None
+                return response.get_data()
+
+            try:
+                payload = store.get_or_compute(key, version, compute)
+            except sqlite3.Error as e:
+                print(f"Result store unavailable for {name}: {e}")
+                return view(*args, **kwargs)
+
+            if "response" in failure:
+                return failure["response"]
+            return Response(payload, mimetype="application/json")
+
+        return wrapper
+
+    return decorator
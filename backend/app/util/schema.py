@@ -0,0 +1,74 @@
+# app/util/schema.py
+from datetime import datetime, time
+
+# Bumped when SCHEMAS changes, so an unchanged archive is still re-synced
+SCHEMA_VERSION = "1"
+
+# Typed fields of the CORDIS CSVs, applied at ingest: dates become BSON
+# dates and amounts (comma decimals, e.g. "226276,8") become doubles
+SCHEMAS = {
+    "projects": {
+        "startDate": "date",
+        "endDate": "date",
+        "ecSignatureDate": "date",
+        "contentUpdateDate": "date",
+        "ecMaxContribution": "money",
+        "totalCost": "money",
+    },
+    "organizations": {
+        "ecContribution": "money",
+        "netEcContribution": "money",
+        "totalCost": "money",
+        "contentUpdateDate": "date",
+    },
+    "topics": {},
+}
+
+# Bookkeeping fields the sync keeps on every row; API reads project them out
+SYNC_FIELDS = ("_rowKey", "_rowHash", "_syncGeneration")
+HIDE_SYNC_FIELDS = {field: 0 for field in SYNC_FIELDS}
+
+DATE_FORMATS = ("%Y-%m-%d", "%Y-%m-%d %H:%M:%S", "%Y-%m-%dT%H:%M:%S")
+
+
+def parse_date(value):
+    """A datetime for a CORDIS date string, None if empty or invalid."""
+    if isinstance(value, datetime) or value is None:
+        return value
+    value = str(value).strip()
+    for fmt in DATE_FORMATS:
+        try:
+            return datetime.strptime(value, fmt)
+        except ValueError:
+            continue
+    return None
+
+
+def parse_money(value):
+    """A float for a CORDIS amount, None if empty or invalid."""
+    if isinstance(value, (int, float)) or value is None:
+        return value
+    try:
+        return float(str(value).strip().replace(",", "."))
+    except ValueError:
+        return None
+
+
+CONVERTERS = {"date": parse_date, "money": parse_money}
+
+
+def apply_schema(doc, collection):
+    """Convert the typed fields of `collection` in place and return `doc`."""
+    for field, kind in SCHEMAS.get(collection, {}).items():
+        if field in doc:
+            doc[field] = CONVERTERS[kind](doc[field])
+    return doc
+
+
+def iso_date(value):
+    """ISO string for a stored date: plain dates as YYYY-MM-DD, others with the time."""
+    if not isinstance(value, datetime):
+        return value
+    if value.time() == time.min:
+        return value.date().isoformat()
+    return value.isoformat()
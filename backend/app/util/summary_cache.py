@@ -0,0 +1,115 @@
+# app/util/summary_cache.py
+from collections import OrderedDict
+from datetime import datetime
+import hashlib
+import threading
+
+from pymongo.errors import BulkWriteError, PyMongoError
+
+
+class SummaryCache:
+    """
+    Two-tier cache for objective summaries: a bounded in-process LRU in front
+    of a persistent collection. Entries are keyed by a hash of the objective
+    text and the summarizer version, so a new version never reads old output.
+    """
+
+    def __init__(self, collection, version, max_entries=2048):
+        self.collection = collection
+        self.version = version
+        self.max_entries = max_entries
+        self._lru = OrderedDict()
+        self._lock = threading.Lock()
+        self._counters = {
+            "lru_hits": 0,
+            "store_hits": 0,
+            "misses": 0,
+            "computed": 0
+        }
+
+    def key(self, text, max_sentences=3):
+        payload = f"{self.version}\x1f{max_sentences}\x1f{text}"
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _lru_get(self, key):
+        with self._lock:
+            if key not in self._lru:
+                return None
+            self._lru.move_to_end(key)
+            self._counters["lru_hits"] += 1
+            return self._lru[key]
+
+    def _lru_put(self, key, summary):
+        with self._lock:
+            self._lru[key] = summary
+            self._lru.move_to_end(key)
+            while len(self._lru) > self.max_entries:
+                self._lru.popitem(last=False)
+
+    def _count(self, name, amount=1):
+        with self._lock:
+            self._counters[name] += amount
+
+    def get_many(self, texts, compute, max_sentences=3):
+        """
+        Return summaries for `texts` in order. LRU misses are looked up in the
+        store with one `$in` query; only the remaining texts are passed to
+        `compute(text, max_sentences)`. `None` results are never cached.
+        """
+        keys = [self.key(text, max_sentences) for text in texts]
+        found = {}
+        for key in set(keys):
+            summary = self._lru_get(key)
+            if summary is not None:
+                found[key] = summary
+
+        pending = [key for key in set(keys) if key not in found]
+        if pending:
+            try:
+                for row in self.collection.find({"_id": {"$in": pending}}, {"summary": 1}):
+                    found[row["_id"]] = row["summary"]
+                    self._lru_put(row["_id"], row["summary"])
+                    self._count("store_hits")
+            except PyMongoError as e:
+                print(f"Error reading summary cache: {e}")
+
+        new_rows = []
+        for text, key in zip(texts, keys):
+            if key in found:
+                continue
+            self._count("misses")
+            summary = compute(text, max_sentences)
+            self._count("computed")
+            found[key] = summary
+            if summary is not None:
+                self._lru_put(key, summary)
+                new_rows.append({
+                    "_id": key,
+                    "summary": summary,
+                    "version": self.version,
+                    "createdAt": datetime.utcnow()
+                })
+
+        if new_rows:
+            try:
+                self.collection.insert_many(new_rows, ordered=False)
+            except BulkWriteError:
+                pass  # another worker stored the same summaries first
+            except PyMongoError as e:
+                print(f"Error storing summaries: {e}")
+
+        return [found.get(key) for key in keys]
+
+    def get_or_compute(self, text, compute, max_sentences=3):
+        return self.get_many([text], compute, max_sentences)[0]
+
+    def stats(self):
+        with self._lock:
+            counters = dict(self._counters)
+            counters["lru_size"] = len(self._lru)
+        counters["lru_max_entries"] = self.max_entries
+        counters["version"] = self.version
+        lookups = counters["lru_hits"] + counters["store_hits"] + counters["misses"]
+        counters["hit_rate"] = round(
+            (counters["lru_hits"] + counters["store_hits"]) / lookups, 3) if lookups else 0.0
+        return counters
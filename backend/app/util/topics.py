@@ -0,0 +1,83 @@
+# app/util/topics.py
+from bisect import bisect_left
+
+
+def _trigrams(text):
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+class TopicCatalogue:
+    """
+    Topic codes with titles and project counts, ranked by count. Code
+    prefixes are looked up with bisect on the sorted codes and substrings of
+    code or title through a trigram index, so a search never scans the
+    whole catalogue for queries of three characters or more.
+    """
+
+    def __init__(self, entries):
+        # Rank order: most used topics first
+        self.entries = sorted(entries, key=lambda e: (-e["project_count"], e["code"]))
+        self._haystacks = [
+            f"{e['code']} {e.get('title') or ''}".lower() for e in self.entries]
+
+        codes = sorted((e["code"].lower(), rank) for rank, e in enumerate(self.entries))
+        self._codes = [code for code, _ in codes]
+        self._code_ranks = [rank for _, rank in codes]
+
+        self._trigram_index = {}
+        for rank, haystack in enumerate(self._haystacks):
+            for gram in _trigrams(haystack):
+                self._trigram_index.setdefault(gram, []).append(rank)
+
+    def __len__(self):
+        return len(self.entries)
+
+    def _prefix_ranks(self, q):
+        lo = bisect_left(self._codes, q)
+        hi = bisect_left(self._codes, q + "\uffff", lo)
+        return set(self._code_ranks[lo:hi])
+
+    def _substring_ranks(self, q):
+        if len(q) < 3:
+            return {rank for rank, haystack in enumerate(self._haystacks) if q in haystack}
+
+        postings = sorted((self._trigram_index.get(gram, []) for gram in _trigrams(q)), key=len)
+        candidates = set(postings[0])
+        for posting in postings[1:]:
+            candidates.intersection_update(posting)
+            if not candidates:
+                break
+        return {rank for rank in candidates if q in self._haystacks[rank]}
+
+    def search(self, q=""):
+        """Matching entries: code-prefix matches first, then other substring matches, each by count."""
+        q = (q or "").strip().lower()
+        if not q:
+            return self.entries
+
+        prefix = self._prefix_ranks(q)
+        others = self._substring_ranks(q) - prefix
+        return [self.entries[rank] for rank in sorted(prefix)] + \
+            [self.entries[rank] for rank in sorted(others)]
+
+
+def build_topic_catalogue(projects_collection, topics_collection):
+    """Build the catalogue from project topic counts and the CORDIS topic titles."""
+    pipeline = [
+        {"$match": {"topics": {"$nin": [None, ""]}}},
+        {"$unwind": "$topics"},
+        {"$group": {"_id": "$topics", "project_count": {"$sum": 1}}}
+    ]
+    counts = {row["_id"]: row["project_count"]
+              for row in projects_collection.aggregate(pipeline)}
+
+    titles = {}
+    for row in topics_collection.find({}, {"_id": 0, "topic": 1, "title": 1}):
+        if row.get("topic") and row.get("title"):
+            titles.setdefault(row["topic"], row["title"])
+
+    return TopicCatalogue([
+        {"code": code, "title": titles.get(code), "project_count": count}
+        for code, count in counts.items()
+        if isinstance(code, str)
+    ])
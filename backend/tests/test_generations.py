@@ -0,0 +1,74 @@
+import pytest
+
+mongomock = pytest.importorskip("mongomock")
+pytest.importorskip("flask")
+pytest.importorskip("pymongo")
+
+from app.sync_cordis import has_previous_generation, rollback_sync, swap_generations  # noqa: E402
+
+
+@pytest.fixture
+def db():
+    db = mongomock.MongoClient().db
+    db.projects.insert_one({"id": "old"})
+    db.organizations.insert_one({"projectID": "old"})
+    db.projects_staging.insert_one({"id": "new"})
+    db.organizations_staging.insert_one({"projectID": "new"})
+    return db
+
+
+def ids(collection):
+    return [doc.get("id") or doc.get("projectID") for doc in collection.find()]
+
+
+def test_swap_keeps_live_as_previous(db):
+    swap_generations(db)
+
+    assert ids(db.projects) == ["new"]
+    assert ids(db.organizations) == ["new"]
+    assert ids(db.projects_previous) == ["old"]
+    assert "projects_staging" not in db.list_collection_names()
+
+
+def test_rollback_restores_previous(db):
+    swap_generations(db)
+    rollback_sync(db)
+
+    assert ids(db.projects) == ["old"]
+    assert ids(db.organizations) == ["old"]
+    assert not has_previous_generation(db)
+
+
+def test_rollback_after_delta_needs_force(db):
+    swap_generations(db)
+    db.meta.update_one({"_id": "dataset"}, {"$set": {"deltasSincePrevious": 2}}, upsert=True)
+
+    with pytest.raises(RuntimeError, match="2 delta sync"):
+        rollback_sync(db)
+    assert ids(db.projects) == ["new"]
+
+    rollback_sync(db, force=True)
+    assert ids(db.projects) == ["old"]
+
+
+def test_full_sync_keeps_keywords_of_unchanged_projects(monkeypatch):
+    from pymongo import UpdateMany
+    import app.sync_cordis as sync_cordis
+    from app.util.nlp import keywords_content_hash
+
+    # mongomock 4.3 cannot apply pymongo 4.9+ UpdateOne requests; the
+    # filters here are by _id, so UpdateMany writes the same single row
+    monkeypatch.setattr(sync_cordis, "UpdateOne", UpdateMany)
+    carry_over_keywords = sync_cordis.carry_over_keywords
+
+    db = mongomock.MongoClient().db
+    same = {"id": "1", "title": "Same", "objective": "Unchanged objective"}
+    edited = {"id": "2", "title": "Before", "objective": "Old objective"}
+    for project in (same, edited):
+        db.projects.insert_one(dict(project, extracted_keywords=["kept"],
+                                    extracted_keywords_hash=keywords_content_hash(project)))
+    db.projects_staging.insert_many([dict(same), dict(edited, title="After")])
+
+    assert carry_over_keywords(db) == 1
+    assert db.projects_staging.find_one({"id": "1"})["extracted_keywords"] == ["kept"]
+    assert "extracted_keywords" not in db.projects_staging.find_one({"id": "2"})
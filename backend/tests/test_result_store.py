@@ -0,0 +1,21 @@
+import time
+
+from app.util.result_store import ResultStore
+
+
+def test_prune_keeps_newer_version_for_lagging_worker(tmp_path):
+    store = ResultStore(str(tmp_path / "results.db"))
+    key = lambda version, page: store.make_key("search", {"page": page}, version)
+
+    store.get_or_compute(key("old", 1), "old", lambda: b"1")
+    time.sleep(0.01)
+    store.get_or_compute(key("new", 1), "new", lambda: b"2")
+    assert store.get(key("old", 1)) is None
+
+    # A worker still on the old version must not prune the new entries
+    time.sleep(0.01)
+    store.get_or_compute(key("old", 2), "old", lambda: b"3")
+    assert store.get(key("new", 1)) is not None
+
+    store.get_or_compute(key("new", 2), "new", lambda: b"4")
+    assert store.get(key("old", 2)) is None
@@ -0,0 +1,47 @@
+import pytest
+
+mongomock = pytest.importorskip("mongomock")
+pytest.importorskip("flask")
+pytest.importorskip("pymongo")
+
+from app.sync_cordis import SOURCES, delta_load  # noqa: E402
+
+KEY_FIELDS = SOURCES["organization"][1]
+
+
+def organization_rows(count, start=0):
+    return [
+        {"projectID": str(100 + i), "organisationID": str(900 + i), "order": "1",
+         "name": f"Organisation {i}", "country": "BE", "role": "participant"}
+        for i in range(start, start + count)
+    ]
+
+
+@pytest.fixture
+def organizations():
+    collection = mongomock.MongoClient().db.organizations
+    delta_load(collection, organization_rows(50), KEY_FIELDS)
+    assert collection.count_documents({}) == 50
+    return collection
+
+
+def test_removed_rows_are_deleted(organizations):
+    result = delta_load(organizations, organization_rows(45), KEY_FIELDS)
+
+    assert result.counts["deleted"] == 5
+    assert result.counts["unchanged"] == 45
+    assert organizations.count_documents({}) == 45
+
+
+def test_empty_csv_deletes_nothing(organizations):
+    with pytest.raises(RuntimeError, match="no rows"):
+        delta_load(organizations, iter(()), KEY_FIELDS)
+
+    assert organizations.count_documents({}) == 50
+
+
+def test_losing_most_rows_deletes_nothing(organizations):
+    with pytest.raises(RuntimeError, match="would delete 40 of 50"):
+        delta_load(organizations, organization_rows(10), KEY_FIELDS)
+
+    assert organizations.count_documents({}) == 50
@@ -2,7 +2,7 @@ import React, { useEffect, useState } from 'react';
 import Cards from './Cards';
 import FavoriteIcon from '@mui/icons-material/Favorite';
 import { getFavorites } from '../services/userApi';
-import { GetProjectById } from '../services/api';
+import { GetProjectsByIds } from '../services/api';
 import { useAuth } from '@clerk/clerk-react';
 
 const FavoriteProjects = () => {
@@ -31,9 +31,9 @@ const FavoriteProjects = () => {
                     return;
                 }
 
-                // Step 2: Fetch full project data for each ID
-                const projectPromises = favoriteIds.map(id => GetProjectById(id));
-                const projects = await Promise.all(projectPromises);
+                // Step 2: Fetch the projects in one batch; the cards only need
+                // organizations, not keywords or summaries
+                const projects = await GetProjectsByIds(favoriteIds, 'organizations');
 
                 // Step 3: Add isExpired flag to each project
                 const updatedProjects = projects.map(p => ({
@@ -3,7 +3,7 @@ import React, { useEffect, useState } from 'react';
 import { useAuth } from '@clerk/clerk-react';
 import { useNavigate } from 'react-router-dom';
 import { getHistory, deleteAllHistory, deleteHistoryItem, addFavorite } from '../../services/userApi';
-import { GetProjectById } from '../../services/api';
+import { GetProjectsByIds } from '../../services/api';
 import HistoryIcon from '@mui/icons-material/History';
 import { useTheme } from '../../contexts/ThemeContext';
 
@@ -54,22 +54,17 @@ const HistoryPage = () => {
                 return;
             }
 
-            // Fetch full project data for each history item
-            const projectPromises = historyData.map(async (item) => {
-                try {
-                    const project = await GetProjectById(item.projectId);
-                    return {
-                        ...project,
-                        openedAt: item.openedAt
-                    };
-                } catch (err) {
-                    console.error(`Failed to fetch project ${item.projectId}:`, err);
-                    return null;
-                }
-            });
-
-            const projects = await Promise.all(projectPromises);
-            setHistoryProjects(projects.filter(p => p !== null));
+            // Fetch the projects of all history items in one batch
+            const projects = await GetProjectsByIds(
+                [...new Set(historyData.map(item => item.projectId))], 'organizations');
+            const projectsById = new Map(projects.map(p => [p.id, p]));
+
+            setHistoryProjects(historyData
+                .filter(item => projectsById.has(item.projectId))
+                .map(item => ({
+                    ...projectsById.get(item.projectId),
+                    openedAt: item.openedAt
+                })));
         } catch (err) {
             console.error('Failed to fetch history:', err);
         } finally {
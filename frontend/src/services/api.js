@@ -45,6 +45,30 @@ export const GetProjectById = async (id) => {
     return res.data;
 };
 
+// The batch endpoint accepts at most this many ids per request
+const BATCH_SIZE = 100;
+
+/**
+ * Fetch several projects in the order of `ids` with /projects/batch.
+ * `fields` picks the detail sections (organizations, keywords, summary);
+ * an empty string returns the plain project documents.
+ */
+export const GetProjectsByIds = async (ids, fields) => {
+    const chunks = [];
+    for (let i = 0; i < ids.length; i += BATCH_SIZE) {
+        chunks.push(ids.slice(i, i + BATCH_SIZE));
+    }
+
+    const responses = await Promise.all(chunks.map(chunk => {
+        const params = { ids: chunk.join(',') };
+        if (fields !== undefined) {
+            params.fields = fields;
+        }
+        return client.get('projects/batch', { params });
+    }));
+    return responses.flatMap(res => res.data.projects);
+};
+
 
 export async function AllProjects() {
     const { data } = await client.get('projects');